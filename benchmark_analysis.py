@@ -6,6 +6,8 @@ This script analyzes the comparative benchmark results and provides insights
 about uubed's performance relative to alternative encoding libraries.
 """
 
+import functools
+import hashlib
 import json
 import subprocess
 import sys
@@ -13,25 +15,107 @@ from pathlib import Path
 from typing import Dict, List, Any
 import time
 
+import numpy as np
+
+CRITERION_DIR = Path("target") / "criterion"
+BENCH_CACHE_DIR = Path(".bench_cache")
+
+@functools.lru_cache(maxsize=None)
+def _bench_cache_key() -> str:
+    """Content hash of the lockfile, benchmark and crate sources and rustc version"""
+    # Inputs that determine benchmark results; any change invalidates the cache
+    inputs = [Path("Cargo.lock"), Path("rust/benches/comparative_bench.rs")]
+    inputs += sorted(Path("rust/src").glob("**/*.rs"))
+    
+    h = hashlib.blake2b()
+    for path in inputs:
+        if path.exists():
+            h.update(path.read_bytes())
+    try:
+        h.update(subprocess.check_output(["rustc", "--version"]))
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    return h.hexdigest()
+
+def _bench_cache_file() -> Path:
+    return BENCH_CACHE_DIR / f"{_bench_cache_key()}.json"
+
+def _load_bench_cache() -> Dict[str, Any]:
+    """Load cached benchmark results for the current inputs, if any"""
+    cache_file = _bench_cache_file()
+    if not cache_file.exists():
+        return {}
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def _store_bench_cache(key: str, value: Any):
+    """Persist one benchmark result set under the current cache key"""
+    cache = _load_bench_cache()
+    cache[key] = value
+    BENCH_CACHE_DIR.mkdir(exist_ok=True)
+    with open(_bench_cache_file(), "w") as f:
+        json.dump(cache, f, indent=2)
+
+def load_criterion_results(group: str, value: str = None) -> Dict[str, Dict[str, Any]]:
+    """Collect Criterion estimates for a benchmark group, keyed by benchmark id
+
+    Reads ``target/criterion/**/new/{benchmark,estimates}.json`` written by
+    ``cargo bench`` instead of scraping its human-readable output.
+    """
+    results = {}
+    for meta_file in CRITERION_DIR.glob("**/new/benchmark.json"):
+        try:
+            with open(meta_file) as f:
+                meta = json.load(f)
+            if meta.get("group_id") != group:
+                continue
+            if value is not None and meta.get("value_str") != value:
+                continue
+            with open(meta_file.with_name("estimates.json")) as f:
+                estimates = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+
+        results[meta["full_id"]] = {
+            "function": meta.get("function_id") or meta["full_id"],
+            "mean_ns": estimates["mean"]["point_estimate"],
+            "throughput": meta.get("throughput"),
+        }
+    return results
+
 def run_benchmark_subset():
     """Run a focused subset of benchmarks for quick analysis"""
     print("🔥 Running Comparative Benchmarks (subset)")
     print("=" * 60)
     
-    # Run size efficiency analysis first (fast)
+    cached = _load_bench_cache().get("size_analysis")
+    if cached is not None:
+        print("✅ Size efficiency analysis loaded from cache")
+        print("\nOutput:")
+        print(cached)
+        return True
+    
+    # Run size efficiency analysis first (fast), echoing output as it arrives;
+    # cargo's own progress and errors go straight to the terminal on stderr
     try:
-        result = subprocess.run([
+        print("\nOutput:")
+        lines = []
+        with subprocess.Popen([
             "cargo", "bench", "--bench", "comparative_bench", 
             "--no-default-features", "--", "size_analysis_dummy"
-        ], capture_output=True, text=True, cwd="rust")
+        ], stdout=subprocess.PIPE, text=True, bufsize=1, cwd="rust") as proc:
+            for line in proc.stdout:
+                print(line, end="")
+                lines.append(line)
         
-        if result.returncode == 0:
+        if proc.returncode == 0:
             print("✅ Size efficiency analysis completed")
-            print("\nOutput:")
-            print(result.stdout)
+            _store_bench_cache("size_analysis", "".join(lines))
         else:
-            print("❌ Benchmark failed:")
-            print(result.stderr)
+            print(f"❌ Benchmark failed with exit code {proc.returncode}")
             return False
     except Exception as e:
         print(f"❌ Error running benchmark: {e}")
@@ -44,26 +128,40 @@ def run_encoding_speed_sample():
     print("\n🚀 Running Encoding Speed Sample")
     print("=" * 60)
     
-    try:
-        result = subprocess.run([
-            "cargo", "bench", "--bench", "comparative_bench",
-            "--no-default-features", "--", "encoding_speed/small_random"
-        ], capture_output=True, text=True, cwd="rust")
+    results = _load_bench_cache().get("encoding_speed")
+    if results:
+        print("✅ Encoding speed sample loaded from cache")
+    else:
+        try:
+            result = subprocess.run([
+                "cargo", "bench", "--bench", "comparative_bench",
+                "--no-default-features", "--", "encoding_speed/.*/small_random"
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, cwd="rust")
+            
+            if result.returncode != 0:
+                print("❌ Encoding benchmark failed:")
+                print(result.stderr)
+                return False
+        except Exception as e:
+            print(f"❌ Error running encoding benchmark: {e}")
+            return False
         
-        if result.returncode == 0:
-            print("✅ Encoding speed sample completed")
-            # Extract key metrics from output
-            lines = result.stdout.split('\n')
-            for line in lines:
-                if any(keyword in line.lower() for keyword in ['time:', 'throughput:', 'uubed', 'base64', 'hex']):
-                    print(f"  {line.strip()}")
-        else:
-            print("❌ Encoding benchmark failed:")
-            print(result.stderr)
+        results = load_criterion_results("encoding_speed", "small_random")
+        if not results:
+            print("❌ No Criterion estimates found under target/criterion")
             return False
-    except Exception as e:
-        print(f"❌ Error running encoding benchmark: {e}")
-        return False
+        print("✅ Encoding speed sample completed")
+        _store_bench_cache("encoding_speed", results)
+    
+    # Report key metrics, fastest first
+    for bench_id in sorted(results, key=lambda k: results[k]["mean_ns"]):
+        entry = results[bench_id]
+        line = f"  {entry['function']:<20} {entry['mean_ns']:>12.1f} ns"
+        throughput = entry.get("throughput") or {}
+        if "Bytes" in throughput and entry["mean_ns"] > 0:
+            mb_per_s = throughput["Bytes"] / entry["mean_ns"] * 1e3
+            line += f"  {mb_per_s:>10.1f} MB/s"
+        print(line)
     
     return True
 
@@ -72,24 +170,24 @@ def analyze_theoretical_performance():
     print("\n📊 Theoretical Performance Analysis")
     print("=" * 60)
     
-    # Data sizes for analysis
-    sizes = [64, 512, 4096, 16384]  # bytes
+    # Data sizes for analysis (bytes)
+    sizes = np.array([64, 512, 4096, 16384], dtype=np.int64)
+    
+    # Theoretical output sizes, one row per algorithm
+    algorithms = ["Q64", "Base64", "Hex"]
+    notes = ["Position-safe encoding", "Standard, padding", "Simple, larger output"]
+    table = np.vstack([
+        sizes * 2,                 # Q64 uses 2 chars per byte
+        ((sizes + 2) // 3) * 4,    # Base64 formula
+        sizes * 2,                 # Hex uses 2 chars per byte
+    ])
     
     print(f"{'Algorithm':<15} {'64B':<8} {'512B':<8} {'4KB':<8} {'16KB':<8} {'Notes'}")
     print("-" * 80)
     
-    for size in sizes:
-        # Calculate theoretical output sizes
-        q64_size = size * 2  # Q64 uses 2 chars per byte
-        base64_size = ((size + 2) // 3) * 4  # Base64 formula
-        hex_size = size * 2  # Hex uses 2 chars per byte
-        
-        if size == 64:
-            print(f"{'Q64':<15} {q64_size:<8} {'Position-safe encoding'}")
-        elif size == 512:
-            print(f"{'Base64':<15} {base64_size:<8} {'Standard, padding'}")
-        elif size == 4096:
-            print(f"{'Hex':<15} {hex_size:<8} {'Simple, larger output'}")
+    for name, row, note in zip(algorithms, table, notes):
+        cells = " ".join(f"{int(n):<8}" for n in row)
+        print(f"{name:<15} {cells} {note}")
     
     print("\nKey Characteristics:")
     print("• Q64: Position-dependent alphabets, deterministic, 2:1 expansion")
@@ -174,7 +272,7 @@ def create_performance_summary():
 
 def main():
     """Main analysis function"""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     print("🧪 uubed-rs Comparative Performance Analysis")
     print("=" * 60)
@@ -206,7 +304,7 @@ def main():
     else:
         print("\n⚠️  Benchmark execution failed - analysis based on theoretical characteristics")
     
-    elapsed = time.time() - start_time
+    elapsed = (time.perf_counter_ns() - start_ns) / 1e9
     print(f"\n📋 Analysis completed in {elapsed:.2f} seconds")
     print()
     print("🔗 For full benchmark results, run:")
@@ -16,12 +16,15 @@ from typing import List
 # Note: This would normally be imported after building the library
 # import uubed_native
 
+RNG = np.random.default_rng(0xC0FFEE)
+DEMO_BYTES = bytes.fromhex("123456789abcdef0")
+
 def demo_basic_encoding():
     """Demonstrate basic Q64 encoding functionality"""
     print("=== Basic Q64 Encoding Demo ===")
     
     # Test data
-    data = bytes([0x12, 0x34, 0x56, 0x78, 0x9A, 0xBC, 0xDE, 0xF0])
+    data = DEMO_BYTES
     print(f"Original data: {data.hex()}")
     
     # Basic encoding
@@ -51,16 +54,14 @@ def demo_batch_processing():
     """Demonstrate batch processing with buffer pooling"""
     print("\n=== Batch Processing Demo ===")
     
-    # Create multiple embeddings
-    embeddings = [
-        np.random.randint(0, 256, size=1000, dtype=np.uint8) 
-        for _ in range(100)
-    ]
+    # Create multiple embeddings as one contiguous (batch, size) array;
+    # each row is a zero-copy view usable through the buffer protocol
+    embeddings = RNG.integers(0, 256, size=(100, 1000), dtype=np.uint8)
     print(f"Created {len(embeddings)} embeddings of size 1000 each")
     
-    # Batch processing with buffer reuse
+    # Matrix batch encoding: the whole 2-D array crosses the FFI boundary once
     # start_time = time.time()
-    # results = uubed_native.q64_encode_batch_native(embeddings, reuse_buffers=True)
+    # results = uubed_native.q64_encode_matrix_native(embeddings)
     # batch_time = time.time() - start_time
     # print(f"Batch encoding completed in {batch_time:.3f}s")
     # print(f"Average time per embedding: {batch_time/len(embeddings)*1000:.2f}ms")
@@ -82,7 +83,7 @@ def demo_streaming_encoder():
     
     # Process chunks
     # for i in range(num_chunks):
-    #     chunk = np.random.randint(0, 256, size=chunk_size, dtype=np.uint8)
+    #     chunk = RNG.integers(0, 256, size=chunk_size, dtype=np.uint8)
     #     encoded_chunk = encoder.encode_chunk(chunk)
     #     print(f"Processed chunk {i+1}/{num_chunks}: {len(encoded_chunk)} bytes")
     print("Streaming encoder would handle very large datasets efficiently")
@@ -102,7 +103,7 @@ def demo_performance_monitoring():
     ]
     
     for size, description in operations:
-        # data = np.random.randint(0, 256, size=size, dtype=np.uint8)
+        # data = RNG.integers(0, 256, size=size, dtype=np.uint8)
         # encoded = uubed_native.q64_encode_buffer_native(data)
         print(f"Processed {description}: {size} bytes")
     
@@ -148,10 +149,9 @@ def demo_simple_batch_processor():
     batch_size = 5000
     embedding_size = 512
     
-    # embeddings = [
-    #     np.random.randint(0, 256, size=embedding_size, dtype=np.uint8)
-    #     for _ in range(batch_size)
-    # ]
+    # embeddings = RNG.integers(
+    #     0, 256, size=(batch_size, embedding_size), dtype=np.uint8
+    # )
     
     # start_time = time.time()
     # results = processor.process_batch(embeddings)
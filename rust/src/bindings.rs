@@ -4,15 +4,30 @@
 use pyo3::prelude::*;
 use pyo3::exceptions::PyValueError;
 use pyo3::buffer::PyBuffer;
-use pyo3::types::PyBytes;
-use std::collections::HashMap;
+use pyo3::types::{PyByteArray, PyBytes};
+use std::borrow::Cow;
+use std::collections::{HashMap, VecDeque};
+use std::sync::Mutex;
+use std::sync::atomic::{AtomicU64, Ordering};
 use std::cell::Cell;
+use std::ops::Range;
 
 /// Encode bytes using Q64 algorithm
+///
+/// Accepts `bytes`, any uint8 buffer (e.g. a numpy array, read without
+/// copying) or a sequence of ints in 0..=255, which is converted in a single
+/// pass on the Rust side.
 #[pyfunction]
 #[pyo3(signature = (data))]
-fn q64_encode_native(data: &[u8]) -> String {
-    crate::encoders::q64_encode(data)
+fn q64_encode_native(py: Python<'_>, data: &Bound<'_, PyAny>) -> PyResult<String> {
+    if let Ok(bytes) = data.downcast::<PyBytes>() {
+        return Ok(crate::encoders::q64_encode(bytes.as_bytes()));
+    }
+    if let Ok(buffer) = PyBuffer::<u8>::get_bound(data) {
+        return Ok(crate::encoders::q64_encode(&buffer_bytes(py, &buffer)?));
+    }
+    let values: Vec<u8> = data.extract()?;
+    Ok(crate::encoders::q64_encode(&values))
 }
 
 /// Decode Q64 string to bytes
@@ -24,61 +39,353 @@ fn q64_decode_native(encoded: &str) -> PyResult<Vec<u8>> {
 }
 
 /// Zero-copy Q64 encoding using PyBuffer (supports numpy arrays, bytearrays)
+///
+/// C-contiguous buffers are encoded in place; strided views (e.g. `arr[::2]`)
+/// are gathered into a temporary contiguous copy first.
 #[pyfunction]
 #[pyo3(signature = (data))]
 fn q64_encode_buffer_native(py: Python<'_>, data: PyBuffer<u8>) -> PyResult<Bound<'_, PyBytes>> {
-    // Get read-only view of input data
-    let input_slice = match data.as_slice(py) {
-        Some(slice) => {
-            // Convert ReadOnlyCell to regular slice
-            let bytes: &[u8] = unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) };
-            bytes
-        },
-        None => return Err(PyValueError::new_err("Failed to access input buffer")),
+    let input = buffer_bytes(py, &data)?;
+    
+    q64_pybytes(py, &input)
+}
+
+/// Q64 decoding into a new bytes object (wrap with `np.frombuffer` for an array)
+///
+/// Accepts any buffer of ASCII Q64 characters, e.g. the bytes returned by
+/// `q64_encode_buffer_native`; no intermediate list of ints is built. Large
+/// inputs are decoded with the GIL released.
+#[pyfunction]
+#[pyo3(signature = (encoded))]
+fn q64_decode_buffer_native(py: Python<'_>, encoded: PyBuffer<u8>) -> PyResult<Bound<'_, PyBytes>> {
+    let input = buffer_bytes(py, &encoded)?;
+    
+    // A successful decode writes every byte; on error the partly written
+    // object is dropped here and never reaches Python
+    let (bytes, output) = unsafe { pybytes_uninit(py, input.len() / 2)? };
+    let result = if input.len() >= GIL_RELEASE_MIN_BYTES {
+        py.allow_threads(|| crate::encoders::q64_decode_into(&input, output))
+    } else {
+        crate::encoders::q64_decode_into(&input, output)
     };
+    result.map_err(|e| PyValueError::new_err(e.to_string()))?;
     
-    // Allocate new buffer and encode
-    let encoded = crate::encoders::q64_encode(input_slice);
-    Ok(PyBytes::new_bound(py, encoded.as_bytes()))
+    Ok(bytes)
 }
 
-/// Batch Q64 encoding for multiple embeddings with buffer pooling
+/// Zero-copy Q64 decoding into a caller-provided writable buffer
+///
+/// Returns the number of bytes written (`len(encoded) // 2`).
 #[pyfunction]
-#[pyo3(signature = (embeddings, reuse_buffers=true))]
+#[pyo3(signature = (encoded, output_buffer))]
+fn q64_decode_inplace_native(
+    py: Python<'_>,
+    encoded: PyBuffer<u8>,
+    output_buffer: PyBuffer<u8>
+) -> PyResult<usize> {
+    let input = buffer_bytes(py, &encoded)?;
+    
+    let output_slice = buffer_slice_mut(py, &output_buffer)?;
+    
+    py.allow_threads(|| crate::encoders::q64_decode_into(&input, output_slice))
+        .map_err(|e| PyValueError::new_err(e.to_string()))
+}
+
+/// Batch Q64 encoding for multiple embeddings
+///
+/// Accepts a 2-D uint8 array or a sequence of 1-D buffers. Each result is
+/// encoded straight into its output object, so no staging buffer is needed;
+/// `reuse_buffers` is kept for API compatibility.
+///
+/// `output_type` selects the result objects: `"bytes"` (the default) or
+/// `"bytearray"`. Bytearrays are owned by the caller and can be modified or
+/// resized in place by later processing steps without another copy.
+#[pyfunction]
+#[pyo3(signature = (embeddings, reuse_buffers=true, output_type="bytes"))]
 fn q64_encode_batch_native(
     py: Python<'_>,
-    embeddings: Vec<PyBuffer<u8>>,
+    embeddings: &Bound<'_, PyAny>,
     reuse_buffers: bool,
-) -> PyResult<Vec<Bound<'_, PyBytes>>> {
-    let mut results = Vec::with_capacity(embeddings.len());
-    let mut buffer_pool: Option<Vec<u8>> = if reuse_buffers { Some(Vec::new()) } else { None };
-    
-    for data_buffer in embeddings {
-        let input_slice = match data_buffer.as_slice(py) {
-            Some(slice) => {
-                unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) }
-            },
-            None => return Err(PyValueError::new_err("Failed to access input buffer")),
-        };
-        
-        let required_len = input_slice.len() * 2;
-        
-        if let Some(ref mut pool_buffer) = buffer_pool {
-            // Reuse buffer from pool
-            if pool_buffer.len() < required_len {
-                pool_buffer.resize(required_len, 0);
+    output_type: &str,
+) -> PyResult<Vec<PyObject>> {
+    let _ = reuse_buffers;
+    let batch = EmbeddingBatch::extract(embeddings)?;
+    let rows = batch.slices(py)?;
+    
+    match output_type {
+        "bytes" => Ok(q64_pybytes_batch(py, &rows, None)?
+            .into_iter()
+            .map(|bytes| bytes.into_any().unbind())
+            .collect()),
+        "bytearray" => {
+            let mut results = Vec::with_capacity(rows.len());
+            let mut outputs: Vec<&mut [u8]> = Vec::with_capacity(rows.len());
+            for row in &rows {
+                // Each new bytearray is fully written by `q64_encode_rows` below,
+                // before any of them is returned to Python
+                let (array, output) = unsafe { pybytearray_uninit(py, row.len() * 2)? };
+                results.push(array);
+                outputs.push(output);
             }
+            q64_encode_rows(py, &rows, outputs, None);
             
-            crate::encoders::q64_encode_to_buffer(input_slice, &mut pool_buffer[..required_len])
-                .map_err(|e| PyValueError::new_err(e.to_string()))?;
-                
-            results.push(PyBytes::new_bound(py, &pool_buffer[..required_len]));
-        } else {
-            // Allocate new buffer for each
-            let encoded = crate::encoders::q64_encode(input_slice);
-            results.push(PyBytes::new_bound(py, encoded.as_bytes()));
+            Ok(results.into_iter().map(|array| array.into_any().unbind()).collect())
+        }
+        _ => Err(PyValueError::new_err(format!(
+            "output_type must be 'bytes' or 'bytearray', got '{}'",
+            output_type
+        ))),
+    }
+}
+
+/// Inputs at least this large are encoded with the GIL released; below it,
+/// releasing and re-acquiring the GIL costs more than the encoding itself
+const GIL_RELEASE_MIN_BYTES: usize = 16 * 1024;
+
+/// Allocate a bytes object of `len` bytes without initialising its contents
+///
+/// Returns the object with a mutable view of its data, taken from
+/// `PyBytes_AsString` as `PyBytes::new_bound_with` does, but without zeroing
+/// it first.
+///
+/// # Safety
+/// Every byte of the view must be written before the object is handed to
+/// Python, and the view must not outlive the object.
+unsafe fn pybytes_uninit<'py>(py: Python<'py>, len: usize) -> PyResult<(Bound<'py, PyBytes>, &'py mut [u8])> {
+    let ptr = pyo3::ffi::PyBytes_FromStringAndSize(std::ptr::null(), len as pyo3::ffi::Py_ssize_t);
+    let bytes = Bound::from_owned_ptr_or_err(py, ptr)?.downcast_into_unchecked::<PyBytes>();
+    let data = pyo3::ffi::PyBytes_AsString(ptr) as *mut u8;
+    Ok((bytes, std::slice::from_raw_parts_mut(data, len)))
+}
+
+/// Allocate a bytearray of `len` bytes without initialising its contents
+///
+/// Bytearray counterpart of `pybytes_uninit`, with the same requirements.
+///
+/// # Safety
+/// Every byte of the view must be written before the object is handed to
+/// Python, and the view must not outlive the object.
+unsafe fn pybytearray_uninit<'py>(
+    py: Python<'py>,
+    len: usize,
+) -> PyResult<(Bound<'py, PyByteArray>, &'py mut [u8])> {
+    let ptr = pyo3::ffi::PyByteArray_FromStringAndSize(std::ptr::null(), len as pyo3::ffi::Py_ssize_t);
+    let array = Bound::from_owned_ptr_or_err(py, ptr)?.downcast_into_unchecked::<PyByteArray>();
+    let data = pyo3::ffi::PyByteArray_AsString(ptr) as *mut u8;
+    Ok((array, std::slice::from_raw_parts_mut(data, len)))
+}
+
+/// Q64-encode `data` straight into a new bytes object
+fn q64_pybytes<'py>(py: Python<'py>, data: &[u8]) -> PyResult<Bound<'py, PyBytes>> {
+    // The encoder writes every byte of the new object before it is returned
+    let (bytes, output) = unsafe { pybytes_uninit(py, data.len() * 2)? };
+    if data.len() >= GIL_RELEASE_MIN_BYTES {
+        py.allow_threads(|| crate::encoders::q64_encode_into(data, output));
+    } else {
+        crate::encoders::q64_encode_into(data, output);
+    }
+    Ok(bytes)
+}
+
+/// Q64-encode every row straight into its own new bytes object
+///
+/// The result objects are allocated first, then the whole batch is encoded in
+/// one pass, in parallel with the GIL released if the batch is large enough.
+fn q64_pybytes_batch<'py>(
+    py: Python<'py>,
+    rows: &[&[u8]],
+    num_threads: Option<usize>,
+) -> PyResult<Vec<Bound<'py, PyBytes>>> {
+    let mut results = Vec::with_capacity(rows.len());
+    let mut outputs: Vec<&mut [u8]> = Vec::with_capacity(rows.len());
+    for row in rows {
+        // Each new object is fully written by `q64_encode_rows` below, before
+        // any of them is returned to Python
+        let (bytes, output) = unsafe { pybytes_uninit(py, row.len() * 2)? };
+        results.push(bytes);
+        outputs.push(output);
+    }
+    q64_encode_rows(py, rows, outputs, num_threads);
+    
+    Ok(results)
+}
+
+/// Q64-encode each row into the matching output slice
+///
+/// Large batches are encoded in parallel with the GIL released; small ones
+/// inline, where neither is worth its overhead.
+fn q64_encode_rows(
+    py: Python<'_>,
+    rows: &[&[u8]],
+    mut outputs: Vec<&mut [u8]>,
+    num_threads: Option<usize>,
+) {
+    let total_len: usize = rows.iter().map(|row| row.len()).sum();
+    if total_len >= GIL_RELEASE_MIN_BYTES {
+        py.allow_threads(|| {
+            crate::parallel::parallel_q64_encode_into(rows, &mut outputs, num_threads)
+        });
+    } else {
+        for (row, output) in rows.iter().zip(outputs.iter_mut()) {
+            crate::encoders::q64_encode_into(row, output);
+        }
+    }
+}
+
+/// Borrow a C-contiguous uint8 buffer as a byte slice
+fn buffer_slice<'a>(py: Python<'_>, data: &'a PyBuffer<u8>) -> PyResult<&'a [u8]> {
+    match data.as_slice(py) {
+        Some(slice) => {
+            Ok(unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) })
+        },
+        None => Err(PyValueError::new_err("Failed to access input buffer")),
+    }
+}
+
+/// Borrow a writable C-contiguous uint8 buffer as a mutable byte slice
+fn buffer_slice_mut<'a>(py: Python<'_>, data: &'a PyBuffer<u8>) -> PyResult<&'a mut [u8]> {
+    match data.as_mut_slice(py) {
+        Some(slice) => {
+            // Convert &[Cell<u8>] to &mut [u8]
+            Ok(unsafe { std::slice::from_raw_parts_mut(slice.as_ptr() as *mut u8, slice.len()) })
+        },
+        None => Err(PyValueError::new_err("Failed to access output buffer as mutable")),
+    }
+}
+
+/// Borrow a uint8 buffer as a byte slice, copying only if it is not C-contiguous
+fn buffer_bytes<'a>(py: Python<'_>, data: &'a PyBuffer<u8>) -> PyResult<Cow<'a, [u8]>> {
+    if data.is_c_contiguous() {
+        buffer_slice(py, data).map(Cow::Borrowed)
+    } else {
+        data.to_vec(py).map(Cow::Owned)
+    }
+}
+
+/// Borrow a C-contiguous 2-D uint8 buffer as its flat data plus (rows, row length)
+fn matrix_view<'a>(py: Python<'_>, data: &'a PyBuffer<u8>) -> PyResult<(&'a [u8], usize, usize)> {
+    if data.dimensions() != 2 {
+        return Err(PyValueError::new_err(format!(
+            "Expected a 2-D buffer, got {} dimension(s)",
+            data.dimensions()
+        )));
+    }
+    
+    let shape = data.shape();
+    let (rows, row_len) = (shape[0], shape[1]);
+    
+    let flat = match data.as_slice(py) {
+        Some(slice) => {
+            unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) }
+        },
+        None => return Err(PyValueError::new_err("Matrix buffer must be C-contiguous")),
+    };
+    
+    Ok((flat, rows, row_len))
+}
+
+/// Batch of embeddings borrowed from Python
+///
+/// A C-contiguous 2-D uint8 buffer (e.g. a numpy `(batch, dim)` array) is
+/// taken as a single buffer with no per-row Python objects; anything else is
+/// treated as a sequence of 1-D buffers.
+enum EmbeddingBatch {
+    Matrix(PyBuffer<u8>),
+    Rows(Vec<PyBuffer<u8>>),
+}
+
+impl EmbeddingBatch {
+    fn extract(embeddings: &Bound<'_, PyAny>) -> PyResult<Self> {
+        if let Ok(buffer) = PyBuffer::<u8>::get_bound(embeddings) {
+            if buffer.dimensions() == 2 && buffer.is_c_contiguous() {
+                return Ok(Self::Matrix(buffer));
+            }
+        }
+        Ok(Self::Rows(embeddings.extract()?))
+    }
+    
+    /// Number of embeddings in the batch
+    fn len(&self) -> usize {
+        match self {
+            Self::Matrix(buffer) => buffer.shape()[0],
+            Self::Rows(buffers) => buffers.len(),
+        }
+    }
+    
+    /// Borrow every embedding as a byte slice
+    fn slices<'a>(&'a self, py: Python<'_>) -> PyResult<Vec<&'a [u8]>> {
+        self.slice_range(py, 0..self.len())
+    }
+    
+    /// Borrow the embeddings in `rows` as byte slices
+    fn slice_range<'a>(&'a self, py: Python<'_>, rows: Range<usize>) -> PyResult<Vec<&'a [u8]>> {
+        match self {
+            Self::Matrix(buffer) => {
+                let (flat, _, row_len) = matrix_view(py, buffer)?;
+                if row_len == 0 {
+                    return Ok(vec![&[] as &[u8]; rows.len()]);
+                }
+                Ok(flat[rows.start * row_len..rows.end * row_len].chunks_exact(row_len).collect())
+            },
+            Self::Rows(buffers) => buffers[rows].iter().map(|data| buffer_slice(py, data)).collect(),
         }
     }
+}
+
+/// Batch Q64 encoding of a 2-D uint8 matrix (e.g. a numpy `(batch, dim)` array)
+///
+/// All rows are encoded with a single buffer acquisition and one parallel
+/// dispatch, instead of one FFI crossing per embedding. Each row is written
+/// straight into its bytes object.
+#[pyfunction]
+#[pyo3(signature = (data, num_threads=None))]
+fn q64_encode_matrix_native<'py>(
+    py: Python<'py>,
+    data: PyBuffer<u8>,
+    num_threads: Option<usize>,
+) -> PyResult<Vec<Bound<'py, PyBytes>>> {
+    // Reject anything but a C-contiguous 2-D buffer before slicing it
+    matrix_view(py, &data)?;
+    let batch = EmbeddingBatch::Matrix(data);
+    
+    q64_pybytes_batch(py, &batch.slices(py)?, num_threads)
+}
+
+/// Batch Q64 encoding with native chunking and optional progress reporting
+///
+/// Accepts a 2-D uint8 array or a sequence of 1-D buffers. Chunks are encoded
+/// straight into their bytes objects, in parallel with the GIL released; after
+/// each chunk `progress(done, total)` is called if given.
+#[pyfunction]
+#[pyo3(signature = (embeddings, chunk_size=1000, progress=None))]
+fn q64_encode_batch_chunked<'py>(
+    py: Python<'py>,
+    embeddings: &Bound<'_, PyAny>,
+    chunk_size: usize,
+    progress: Option<PyObject>,
+) -> PyResult<Vec<Bound<'py, PyBytes>>> {
+    if chunk_size == 0 {
+        return Err(PyValueError::new_err("chunk_size must be greater than 0"));
+    }
+    
+    let batch = EmbeddingBatch::extract(embeddings)?;
+    let slices = batch.slices(py)?;
+    
+    let total = slices.len();
+    let mut results = Vec::with_capacity(total);
+    let mut done = 0;
+    
+    for chunk in slices.chunks(chunk_size) {
+        results.extend(q64_pybytes_batch(py, chunk, None)?);
+        
+        done += chunk.len();
+        if let Some(ref callback) = progress {
+            callback.call1(py, (done, total))?;
+        }
+        
+        // Allow Python to handle interrupts
+        py.check_signals()?;
+    }
     
     Ok(results)
 }
@@ -86,7 +393,6 @@ fn q64_encode_batch_native(
 /// Memory-efficient streaming Q64 encoder for very large data
 #[pyclass]
 struct Q64StreamEncoder {
-    buffer: Vec<u8>,
     chunk_size: usize,
 }
 
@@ -95,30 +401,36 @@ impl Q64StreamEncoder {
     #[new]
     #[pyo3(signature = (chunk_size=65536))]
     fn new(chunk_size: usize) -> Self {
-        Self {
-            buffer: Vec::with_capacity(chunk_size * 2),
-            chunk_size,
-        }
+        Self { chunk_size }
     }
     
     /// Encode a chunk of data, yielding results as available
-    fn encode_chunk<'a>(&mut self, py: Python<'a>, data: PyBuffer<u8>) -> PyResult<Bound<'a, PyBytes>> {
-        let input_slice = match data.as_slice(py) {
-            Some(slice) => {
-                unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) }
-            },
-            None => return Err(PyValueError::new_err("Failed to access input buffer")),
-        };
+    ///
+    /// The chunk is encoded straight into the returned bytes object, so the
+    /// only allocation per call is the result itself. Chunks large enough to
+    /// be worth it are encoded with the GIL released.
+    fn encode_chunk<'a>(&self, py: Python<'a>, data: PyBuffer<u8>) -> PyResult<Bound<'a, PyBytes>> {
+        let input = buffer_bytes(py, &data)?;
         
-        let required_len = input_slice.len() * 2;
-        if self.buffer.len() < required_len {
-            self.buffer.resize(required_len, 0);
-        }
+        q64_pybytes(py, &input)
+    }
+    
+    /// Encode a chunk directly into a caller-provided writable buffer
+    ///
+    /// Allocation-free counterpart of `encode_chunk`; returns the number of
+    /// bytes written (`2 * len(data)`).
+    fn encode_chunk_into(
+        &self,
+        py: Python<'_>,
+        data: PyBuffer<u8>,
+        output_buffer: PyBuffer<u8>,
+    ) -> PyResult<usize> {
+        let input = buffer_bytes(py, &data)?;
         
-        crate::encoders::q64_encode_to_buffer(input_slice, &mut self.buffer[..required_len])
-            .map_err(|e| PyValueError::new_err(e.to_string()))?;
-            
-        Ok(PyBytes::new_bound(py, &self.buffer[..required_len]))
+        let output_slice = buffer_slice_mut(py, &output_buffer)?;
+        
+        py.allow_threads(|| crate::encoders::q64_encode_to_buffer(&input, output_slice))
+            .map_err(|e| PyValueError::new_err(e.to_string()))
     }
     
     fn get_chunk_size(&self) -> usize {
@@ -134,41 +446,14 @@ fn q64_encode_inplace_native(
     input_data: PyBuffer<u8>,
     output_buffer: PyBuffer<u8>
 ) -> PyResult<usize> {
-    // Get read-only view of input data
-    let input_slice = match input_data.as_slice(py) {
-        Some(slice) => {
-            unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) }
-        },
-        None => return Err(PyValueError::new_err("Failed to access input buffer")),
-    };
-    
-    // Get mutable view of output buffer  
-    let output_slice = match output_buffer.as_mut_slice(py) {
-        Some(slice) => slice,
-        None => return Err(PyValueError::new_err("Failed to access output buffer as mutable")),
-    };
-    
-    // Check if output buffer is large enough (Q64 encoding doubles the size)
-    let required_output_size = input_slice.len() * 2;
-    if output_slice.len() < required_output_size {
-        return Err(PyValueError::new_err(format!(
-            "Output buffer too small: need {} bytes, got {}",
-            required_output_size,
-            output_slice.len()
-        )));
-    }
-    
-    // Encode directly into the provided output buffer
-    let encoded_str = crate::encoders::q64_encode(input_slice);
-    let encoded_bytes = encoded_str.as_bytes();
+    let input = buffer_bytes(py, &input_data)?;
     
-    // Copy encoded data to output buffer using Cell-compatible method
-    for (i, &byte) in encoded_bytes.iter().enumerate() {
-        output_slice[i].set(byte);
-    }
+    let output_slice = buffer_slice_mut(py, &output_buffer)?;
     
-    // Return the number of bytes written
-    Ok(encoded_bytes.len())
+    // Encode directly into the provided output buffer; fails if it is too
+    // small (Q64 encoding doubles the size)
+    py.allow_threads(|| crate::encoders::q64_encode_to_buffer(&input, output_slice))
+        .map_err(|e| PyValueError::new_err(e.to_string()))
 }
 
 /// Performance monitoring and statistics
@@ -220,31 +505,28 @@ struct SimpleBatchProcessor {
 impl SimpleBatchProcessor {
     #[new]
     #[pyo3(signature = (chunk_size=10000))]
-    fn new(chunk_size: usize) -> Self {
-        Self { chunk_size }
+    fn new(chunk_size: usize) -> PyResult<Self> {
+        if chunk_size == 0 {
+            return Err(PyValueError::new_err("chunk_size must be greater than 0"));
+        }
+        Ok(Self { chunk_size })
     }
     
     /// Process large batch with chunking to manage memory
+    ///
+    /// Accepts a 2-D uint8 array or a sequence of 1-D buffers.
     fn process_batch<'a>(
         &self,
         py: Python<'a>,
-        embeddings: Vec<PyBuffer<u8>>,
+        embeddings: &Bound<'_, PyAny>,
     ) -> PyResult<Vec<Bound<'a, PyBytes>>> {
-        let mut results = Vec::with_capacity(embeddings.len());
+        let batch = EmbeddingBatch::extract(embeddings)?;
+        let slices = batch.slices(py)?;
+        let mut results = Vec::with_capacity(slices.len());
         
         // Process in chunks to manage memory
-        for chunk in embeddings.chunks(self.chunk_size) {
-            for data_buffer in chunk {
-                let input_slice = match data_buffer.as_slice(py) {
-                    Some(slice) => {
-                        unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) }
-                    },
-                    None => return Err(PyValueError::new_err("Failed to access input buffer")),
-                };
-                
-                let encoded = crate::encoders::q64_encode(input_slice);
-                results.push(PyBytes::new_bound(py, encoded.as_bytes()));
-            }
+        for chunk in slices.chunks(self.chunk_size) {
+            results.extend(q64_pybytes_batch(py, chunk, None)?);
             
             // Allow Python to handle interrupts
             py.check_signals()?;
@@ -253,18 +535,129 @@ impl SimpleBatchProcessor {
         Ok(results)
     }
     
+    /// Lazily encode a batch, yielding one bytes object per embedding
+    ///
+    /// Accepts the same inputs as `process_batch`. Rows are encoded
+    /// `chunk_size` at a time as the iterator is consumed, so at most one
+    /// chunk of results is held at once instead of the whole batch.
+    fn process_batch_iter(&self, embeddings: &Bound<'_, PyAny>) -> PyResult<BatchIterator> {
+        Ok(BatchIterator {
+            batch: EmbeddingBatch::extract(embeddings)?,
+            chunk_size: self.chunk_size,
+            next_row: 0,
+            ready: VecDeque::new(),
+        })
+    }
+    
+    /// Encode a 2-D uint8 matrix into a preallocated `(batch, 2 * dim)` output
+    ///
+    /// Rows are written straight into the caller's buffer (e.g. a numpy array)
+    /// in chunks of `chunk_size`, each encoded in parallel with the GIL
+    /// released; no per-row Python objects are created. Returns the number of
+    /// bytes written.
+    fn process_batch_into(
+        &self,
+        py: Python<'_>,
+        embeddings: PyBuffer<u8>,
+        output_buffer: PyBuffer<u8>,
+    ) -> PyResult<usize> {
+        let (flat, _rows, row_len) = matrix_view(py, &embeddings)?;
+        
+        let output_slice = buffer_slice_mut(py, &output_buffer)?;
+        
+        let required_len = flat.len() * 2;
+        if output_slice.len() < required_len {
+            return Err(PyValueError::new_err(format!(
+                "Output buffer too small: need {} bytes, got {}",
+                required_len,
+                output_slice.len()
+            )));
+        }
+        if row_len == 0 {
+            return Ok(0);
+        }
+        
+        // Process in chunks to manage memory
+        let chunk_len = self.chunk_size * row_len;
+        let outputs = output_slice[..required_len].chunks_mut(chunk_len * 2);
+        for (chunk, output) in flat.chunks(chunk_len).zip(outputs) {
+            py.allow_threads(|| {
+                crate::parallel::parallel_q64_encode_matrix(chunk, row_len, output, None)
+            });
+            
+            // Allow Python to handle interrupts
+            py.check_signals()?;
+        }
+        
+        Ok(required_len)
+    }
+    
     fn get_chunk_size(&self) -> usize {
         self.chunk_size
     }
 }
 
-/// Memory pool for efficient buffer reuse
+/// Iterator returned by `SimpleBatchProcessor.process_batch_iter`
 #[pyclass]
+struct BatchIterator {
+    batch: EmbeddingBatch,
+    chunk_size: usize,
+    next_row: usize,
+    ready: VecDeque<Py<PyBytes>>,
+}
+
+#[pymethods]
+impl BatchIterator {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+    
+    fn __next__(&mut self, py: Python<'_>) -> PyResult<Option<Py<PyBytes>>> {
+        if self.ready.is_empty() && self.next_row < self.batch.len() {
+            // Encode the next chunk of rows in one pass
+            let end = (self.next_row + self.chunk_size).min(self.batch.len());
+            let chunk = self.batch.slice_range(py, self.next_row..end)?;
+            self.ready.extend(q64_pybytes_batch(py, &chunk, None)?.into_iter().map(Bound::unbind));
+            self.next_row = end;
+        }
+        Ok(self.ready.pop_front())
+    }
+    
+    fn __length_hint__(&self) -> usize {
+        self.ready.len() + (self.batch.len() - self.next_row)
+    }
+}
+
+/// Smallest pooled size class, as a power of two (64 bytes)
+const POOL_MIN_SHIFT: u32 = 6;
+
+/// Number of pooled size classes: 64 B, 128 B, ... 64 KiB
+const POOL_CLASSES: usize = 11;
+
+/// Size class able to serve a request of `size` bytes, if it is poolable
+fn pool_class_for_size(size: usize) -> Option<usize> {
+    let shift = size.max(1).next_power_of_two().trailing_zeros().max(POOL_MIN_SHIFT);
+    let class = (shift - POOL_MIN_SHIFT) as usize;
+    (class < POOL_CLASSES).then_some(class)
+}
+
+/// Capacity of every buffer held in size class `class`
+fn pool_class_capacity(class: usize) -> usize {
+    1 << (class as u32 + POOL_MIN_SHIFT)
+}
+
+/// Memory pool for efficient buffer reuse
+///
+/// Buffers are binned by power-of-two size class, each bin behind its own
+/// lock, so threads working on different sizes never contend; counters are
+/// atomic and the pool can be shared between threads without a Python-level
+/// borrow.
+#[pyclass(frozen)]
 struct BufferPool {
-    pools: HashMap<usize, Vec<Vec<u8>>>,
+    bins: [Mutex<Vec<Vec<u8>>>; POOL_CLASSES],
     max_pool_size: usize,
-    allocations: u64,
-    reuses: u64,
+    allocations: AtomicU64,
+    reuses: AtomicU64,
 }
 
 #[pymethods]
@@ -273,50 +666,62 @@ impl BufferPool {
     #[pyo3(signature = (max_pool_size=100))]
     fn new(max_pool_size: usize) -> Self {
         Self {
-            pools: HashMap::new(),
+            bins: std::array::from_fn(|_| Mutex::new(Vec::new())),
             max_pool_size,
-            allocations: 0,
-            reuses: 0,
+            allocations: AtomicU64::new(0),
+            reuses: AtomicU64::new(0),
         }
     }
     
-    fn get_buffer(&mut self, size: usize) -> Vec<u8> {
-        if let Some(pool) = self.pools.get_mut(&size) {
-            if let Some(mut buffer) = pool.pop() {
+    fn get_buffer(&self, size: usize) -> Vec<u8> {
+        let class = pool_class_for_size(size);
+        
+        if let Some(class) = class {
+            let pooled = self.bins[class].lock().unwrap().pop();
+            if let Some(mut buffer) = pooled {
                 buffer.clear();
                 buffer.resize(size, 0);
-                self.reuses += 1;
+                self.reuses.fetch_add(1, Ordering::Relaxed);
                 return buffer;
             }
         }
         
-        self.allocations += 1;
-        vec![0u8; size]
+        self.allocations.fetch_add(1, Ordering::Relaxed);
+        
+        // Allocate the full class size so the buffer can serve any request in it
+        let mut buffer = Vec::with_capacity(class.map_or(size, pool_class_capacity));
+        buffer.resize(size, 0);
+        buffer
     }
     
-    fn return_buffer(&mut self, buffer: Vec<u8>) {
-        let size = buffer.capacity();
-        let pool = self.pools.entry(size).or_insert_with(Vec::new);
-        
-        if pool.len() < self.max_pool_size {
-            pool.push(buffer);
+    fn return_buffer(&self, mut buffer: Vec<u8>) {
+        // Buffers come back from Python with capacity equal to their length;
+        // grow them to the full class size so they can serve any request in it
+        if let Some(class) = pool_class_for_size(buffer.capacity()) {
+            let mut bin = self.bins[class].lock().unwrap();
+            if bin.len() < self.max_pool_size {
+                buffer.reserve_exact(pool_class_capacity(class) - buffer.len());
+                bin.push(buffer);
+            }
         }
     }
     
     fn get_stats(&self) -> HashMap<String, u64> {
-        let mut stats = HashMap::new();
-        stats.insert("allocations".to_string(), self.allocations);
-        stats.insert("reuses".to_string(), self.reuses);
-        stats.insert("pool_count".to_string(), self.pools.len() as u64);
+        let bin_sizes: Vec<usize> = self.bins.iter().map(|bin| bin.lock().unwrap().len()).collect();
         
-        let total_pooled: usize = self.pools.values().map(|v| v.len()).sum();
-        stats.insert("total_pooled_buffers".to_string(), total_pooled as u64);
+        let mut stats = HashMap::new();
+        stats.insert("allocations".to_string(), self.allocations.load(Ordering::Relaxed));
+        stats.insert("reuses".to_string(), self.reuses.load(Ordering::Relaxed));
+        stats.insert("pool_count".to_string(), bin_sizes.iter().filter(|&&n| n > 0).count() as u64);
+        stats.insert("total_pooled_buffers".to_string(), bin_sizes.iter().sum::<usize>() as u64);
         
         stats
     }
     
-    fn clear_pools(&mut self) {
-        self.pools.clear();
+    fn clear_pools(&self) {
+        for bin in &self.bins {
+            bin.lock().unwrap().clear();
+        }
     }
 }
 
@@ -374,31 +779,12 @@ fn simhash_to_buffer_native(
     planes: usize,
     output_buffer: PyBuffer<u8>
 ) -> PyResult<usize> {
-    // Get read-only view of input data
-    let input_slice = match input_data.as_slice(py) {
-        Some(slice) => {
-            unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) }
-        },
-        None => return Err(PyValueError::new_err("Failed to access input buffer")),
-    };
+    let input = buffer_bytes(py, &input_data)?;
     
-    // Get mutable view of output buffer  
-    let output_slice = match output_buffer.as_mut_slice(py) {
-        Some(slice) => {
-            // Convert &[Cell<u8>] to &mut [u8]
-            let mut_slice = unsafe {
-                std::slice::from_raw_parts_mut(
-                    slice.as_ptr() as *mut u8,
-                    slice.len()
-                )
-            };
-            mut_slice
-        },
-        None => return Err(PyValueError::new_err("Failed to access output buffer as mutable")),
-    };
+    let output_slice = buffer_slice_mut(py, &output_buffer)?;
     
-    // Encode directly to output buffer
-    crate::encoders::simhash_to_buffer(input_slice, planes, output_slice)
+    // Encode directly to output buffer with the GIL released
+    py.allow_threads(|| crate::encoders::simhash_to_buffer(&input, planes, output_slice))
         .map_err(|e| PyValueError::new_err(e.to_string()))
 }
 
@@ -411,31 +797,12 @@ fn top_k_to_buffer_native(
     k: usize,
     output_buffer: PyBuffer<u8>
 ) -> PyResult<usize> {
-    // Get read-only view of input data
-    let input_slice = match input_data.as_slice(py) {
-        Some(slice) => {
-            unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) }
-        },
-        None => return Err(PyValueError::new_err("Failed to access input buffer")),
-    };
+    let input = buffer_bytes(py, &input_data)?;
     
-    // Get mutable view of output buffer  
-    let output_slice = match output_buffer.as_mut_slice(py) {
-        Some(slice) => {
-            // Convert &[Cell<u8>] to &mut [u8]
-            let mut_slice = unsafe {
-                std::slice::from_raw_parts_mut(
-                    slice.as_ptr() as *mut u8,
-                    slice.len()
-                )
-            };
-            mut_slice
-        },
-        None => return Err(PyValueError::new_err("Failed to access output buffer as mutable")),
-    };
+    let output_slice = buffer_slice_mut(py, &output_buffer)?;
     
-    // Encode directly to output buffer
-    crate::encoders::top_k_to_buffer(input_slice, k, output_slice)
+    // Encode directly to output buffer with the GIL released
+    py.allow_threads(|| crate::encoders::top_k_to_buffer(&input, k, output_slice))
         .map_err(|e| PyValueError::new_err(e.to_string()))
 }
 
@@ -447,63 +814,30 @@ fn z_order_to_buffer_native(
     input_data: PyBuffer<u8>,
     output_buffer: PyBuffer<u8>
 ) -> PyResult<usize> {
-    // Get read-only view of input data
-    let input_slice = match input_data.as_slice(py) {
-        Some(slice) => {
-            unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) }
-        },
-        None => return Err(PyValueError::new_err("Failed to access input buffer")),
-    };
+    let input = buffer_bytes(py, &input_data)?;
     
-    // Get mutable view of output buffer  
-    let output_slice = match output_buffer.as_mut_slice(py) {
-        Some(slice) => {
-            // Convert &[Cell<u8>] to &mut [u8]
-            let mut_slice = unsafe {
-                std::slice::from_raw_parts_mut(
-                    slice.as_ptr() as *mut u8,
-                    slice.len()
-                )
-            };
-            mut_slice
-        },
-        None => return Err(PyValueError::new_err("Failed to access output buffer as mutable")),
-    };
+    let output_slice = buffer_slice_mut(py, &output_buffer)?;
     
-    // Encode directly to output buffer
-    crate::encoders::z_order_to_buffer(input_slice, output_slice)
+    // Encode directly to output buffer with the GIL released
+    py.allow_threads(|| crate::encoders::z_order_to_buffer(&input, output_slice))
         .map_err(|e| PyValueError::new_err(e.to_string()))
 }
 
 /// Parallel Q64 encoding for multiple embeddings
+///
+/// Accepts a 2-D uint8 array or a sequence of 1-D buffers.
 #[pyfunction]
 #[pyo3(signature = (embeddings, num_threads=None))]
 fn parallel_q64_encode_native(
     py: Python<'_>,
-    embeddings: Vec<PyBuffer<u8>>,
+    embeddings: &Bound<'_, PyAny>,
     num_threads: Option<usize>
 ) -> PyResult<Vec<String>> {
-    // Convert PyBuffers to byte slices
-    let mut embedding_data = Vec::new();
-    let mut embedding_refs = Vec::new();
-    
-    for buffer in embeddings {
-        match buffer.as_slice(py) {
-            Some(slice) => {
-                let bytes = unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) };
-                embedding_data.push(bytes.to_vec());
-            },
-            None => return Err(PyValueError::new_err("Failed to access embedding buffer")),
-        }
-    }
-    
-    // Create references
-    for data in &embedding_data {
-        embedding_refs.push(data.as_slice());
-    }
+    let batch = EmbeddingBatch::extract(embeddings)?;
+    let slices = batch.slices(py)?;
     
     // Encode in parallel
-    Ok(crate::parallel::parallel_q64_encode(&embedding_refs, num_threads))
+    Ok(py.allow_threads(|| crate::parallel::parallel_q64_encode(&slices, num_threads)))
 }
 
 /// Parallel SimHash encoding for multiple embeddings
@@ -511,31 +845,15 @@ fn parallel_q64_encode_native(
 #[pyo3(signature = (embeddings, planes, num_threads=None))]
 fn parallel_simhash_encode_native(
     py: Python<'_>,
-    embeddings: Vec<PyBuffer<u8>>,
+    embeddings: &Bound<'_, PyAny>,
     planes: usize,
     num_threads: Option<usize>
 ) -> PyResult<Vec<String>> {
-    // Convert PyBuffers to byte slices
-    let mut embedding_data = Vec::new();
-    let mut embedding_refs = Vec::new();
-    
-    for buffer in embeddings {
-        match buffer.as_slice(py) {
-            Some(slice) => {
-                let bytes = unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) };
-                embedding_data.push(bytes.to_vec());
-            },
-            None => return Err(PyValueError::new_err("Failed to access embedding buffer")),
-        }
-    }
-    
-    // Create references
-    for data in &embedding_data {
-        embedding_refs.push(data.as_slice());
-    }
+    let batch = EmbeddingBatch::extract(embeddings)?;
+    let slices = batch.slices(py)?;
     
     // Encode in parallel
-    Ok(crate::parallel::parallel_simhash_encode(&embedding_refs, planes, num_threads))
+    Ok(py.allow_threads(|| crate::parallel::parallel_simhash_encode(&slices, planes, num_threads)))
 }
 
 /// Parallel Top-K encoding for multiple embeddings
@@ -543,31 +861,46 @@ fn parallel_simhash_encode_native(
 #[pyo3(signature = (embeddings, k, num_threads=None))]
 fn parallel_topk_encode_native(
     py: Python<'_>,
-    embeddings: Vec<PyBuffer<u8>>,
+    embeddings: &Bound<'_, PyAny>,
     k: usize,
     num_threads: Option<usize>
 ) -> PyResult<Vec<String>> {
-    // Convert PyBuffers to byte slices
-    let mut embedding_data = Vec::new();
-    let mut embedding_refs = Vec::new();
-    
-    for buffer in embeddings {
-        match buffer.as_slice(py) {
-            Some(slice) => {
-                let bytes = unsafe { std::slice::from_raw_parts(slice.as_ptr() as *const u8, slice.len()) };
-                embedding_data.push(bytes.to_vec());
-            },
-            None => return Err(PyValueError::new_err("Failed to access embedding buffer")),
-        }
-    }
+    let batch = EmbeddingBatch::extract(embeddings)?;
+    let slices = batch.slices(py)?;
     
-    // Create references
-    for data in &embedding_data {
-        embedding_refs.push(data.as_slice());
+    // Encode in parallel
+    Ok(py.allow_threads(|| crate::parallel::parallel_topk_encode(&slices, k, num_threads)))
+}
+
+/// Fused Q64, SimHash and Top-K encoding for multiple embeddings
+///
+/// Returns `(q64, simhash, topk)` lists computed in a single parallel pass.
+#[pyfunction]
+#[pyo3(signature = (embeddings, planes=64, k=8, num_threads=None))]
+fn encode_all_native(
+    py: Python<'_>,
+    embeddings: &Bound<'_, PyAny>,
+    planes: usize,
+    k: usize,
+    num_threads: Option<usize>
+) -> PyResult<(Vec<String>, Vec<String>, Vec<String>)> {
+    let batch = EmbeddingBatch::extract(embeddings)?;
+    let slices = batch.slices(py)?;
+    
+    let fused = py.allow_threads(|| {
+        crate::parallel::parallel_encode_all(&slices, planes, k, num_threads)
+    });
+    
+    let mut q64 = Vec::with_capacity(fused.len());
+    let mut simhash = Vec::with_capacity(fused.len());
+    let mut topk = Vec::with_capacity(fused.len());
+    for (q, s, t) in fused {
+        q64.push(q);
+        simhash.push(s);
+        topk.push(t);
     }
     
-    // Encode in parallel
-    Ok(crate::parallel::parallel_topk_encode(&embedding_refs, k, num_threads))
+    Ok((q64, simhash, topk))
 }
 
 /// Python module initialization
@@ -580,7 +913,11 @@ fn uubed_native(m: &Bound<'_, PyModule>) -> PyResult<()> {
     // Advanced PyO3 optimized functions
     m.add_function(wrap_pyfunction!(q64_encode_buffer_native, m)?)?;
     m.add_function(wrap_pyfunction!(q64_encode_batch_native, m)?)?;
+    m.add_function(wrap_pyfunction!(q64_encode_matrix_native, m)?)?;
+    m.add_function(wrap_pyfunction!(q64_encode_batch_chunked, m)?)?;
     m.add_function(wrap_pyfunction!(q64_encode_inplace_native, m)?)?;
+    m.add_function(wrap_pyfunction!(q64_decode_buffer_native, m)?)?;
+    m.add_function(wrap_pyfunction!(q64_decode_inplace_native, m)?)?;
     
     // Zero-copy buffer operations
     m.add_function(wrap_pyfunction!(simhash_to_buffer_native, m)?)?;
@@ -591,6 +928,7 @@ fn uubed_native(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(parallel_q64_encode_native, m)?)?;
     m.add_function(wrap_pyfunction!(parallel_simhash_encode_native, m)?)?;
     m.add_function(wrap_pyfunction!(parallel_topk_encode_native, m)?)?;
+    m.add_function(wrap_pyfunction!(encode_all_native, m)?)?;
     
     // Other encoder functions
     m.add_function(wrap_pyfunction!(simhash_q64_native, m)?)?;
@@ -605,6 +943,7 @@ fn uubed_native(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<Q64StreamEncoder>()?;
     m.add_class::<Q64Stats>()?;
     m.add_class::<SimpleBatchProcessor>()?;
+    m.add_class::<BatchIterator>()?;
     m.add_class::<BufferPool>()?;
 
     // Add version info
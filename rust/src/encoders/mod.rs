@@ -8,7 +8,7 @@ pub mod topk;
 pub mod topk_optimized;
 pub mod zorder;
 
-pub use q64::{q64_encode, q64_decode, q64_encode_to_buffer};
+pub use q64::{q64_encode, q64_decode, q64_decode_into, q64_encode_into, q64_encode_to_buffer};
 pub use mq64::{mq64_encode, mq64_encode_with_levels, mq64_decode};
 pub use simhash::{simhash_q64, simhash_to_buffer};
 pub use simhash_safe::{simhash_q64_safe};
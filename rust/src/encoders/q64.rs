@@ -12,6 +12,15 @@ const ALPHABETS: [&[u8; 16]; 4] = [
     b"wxyz0123456789-_",  // pos ≡ 3
 ];
 
+/// The alphabets as one 16-byte aligned table, so SIMD kernels can load each
+/// row as a vector register with an aligned load once per call
+#[cfg(all(any(target_arch = "x86_64", target_arch = "aarch64"), feature = "simd"))]
+#[repr(C, align(16))]
+struct SimdLut([[u8; 16]; 4]);
+
+#[cfg(all(any(target_arch = "x86_64", target_arch = "aarch64"), feature = "simd"))]
+static SIMD_LUT: SimdLut = SimdLut([*ALPHABETS[0], *ALPHABETS[1], *ALPHABETS[2], *ALPHABETS[3]]);
+
 /// Reverse lookup table (ASCII char -> (alphabet_idx, nibble_value))
 /// We use a const fn to build this at compile time for better performance
 const fn build_reverse_lookup() -> [Option<(u8, u8)>; 256] {
@@ -50,24 +59,15 @@ impl Error for Q64Error {}
 /// Encode bytes into Q64 format.
 ///
 /// # Performance
-/// - Uses SIMD when available for parallel nibble extraction
-/// - Processes 16 bytes at a time on x86_64 with AVX2
+/// - Uses SIMD when available for parallel nibble-to-alphabet lookup
+/// - Processes 32 bytes at a time on x86_64 with AVX2, 16 on ARM64 with NEON
 /// - Falls back to scalar code on other architectures
 pub fn q64_encode(data: &[u8]) -> String {
-    let mut result = String::with_capacity(data.len() * 2);
-
-    #[cfg(all(target_arch = "x86_64", feature = "simd"))]
-    {
-        // SIMD fast path for x86_64
-        unsafe { q64_encode_simd(data, &mut result) };
-    }
-    #[cfg(not(all(target_arch = "x86_64", feature = "simd")))]
-    {
-        // Scalar fallback
-        q64_encode_scalar(data, &mut result);
-    }
+    let mut result = vec![0u8; data.len() * 2];
+    q64_encode_into(data, &mut result);
 
-    result
+    // Every Q64 alphabet character is ASCII
+    unsafe { String::from_utf8_unchecked(result) }
 }
 
 /// Zero-copy version: encode bytes into Q64 format using a pre-allocated buffer.
@@ -100,125 +100,374 @@ pub fn q64_encode_to_buffer(data: &[u8], output: &mut [u8]) -> Result<usize, Q64
     Ok(required_len)
 }
 
-/// Zero-copy encoding without bounds checking (unsafe but fast)
+/// Encode bytes into Q64 format, writing straight into `output`.
+///
+/// Infallible counterpart of [`q64_encode_to_buffer`] for callers that size the
+/// output themselves, e.g. when filling a freshly allocated Python `bytes`.
+///
+/// # Panics
+/// If `output` is shorter than `data.len() * 2` bytes.
+pub fn q64_encode_into(data: &[u8], output: &mut [u8]) {
+    assert!(
+        output.len() >= data.len() * 2,
+        "Output buffer too small: need {} bytes, got {}",
+        data.len() * 2,
+        output.len()
+    );
+    q64_encode_to_buffer_unchecked(data, output);
+}
+
+/// Inputs shorter than this skip SIMD dispatch: the portable table path
+/// finishes in less time than feature detection plus a sub-vector tail
+#[cfg(feature = "simd")]
+const SIMD_MIN_BYTES: usize = 32;
+
+/// AVX2 inputs at least this large are written with non-temporal stores
+///
+/// Their output is far larger than the cache, so bypassing it saves the
+/// read-for-ownership of every output line and keeps the caller's working set
+/// cached. For smaller outputs regular stores win, most of all when the
+/// result is read back soon after (e.g. 64 KiB: 16 vs 10 GB/s write-only).
+#[cfg(all(target_arch = "x86_64", feature = "simd"))]
+const NON_TEMPORAL_MIN_BYTES: usize = 32 << 20;
+
+/// Zero-copy encoding without bounds checking, dispatching to the fastest kernel
+///
+/// Output characters depend only on the parity of the input byte index, so a
+/// kernel may start on any even byte offset with local indices.
 ///
 /// # Safety
 /// Caller must ensure output buffer is at least `data.len() * 2` bytes
 fn q64_encode_to_buffer_unchecked(data: &[u8], output: &mut [u8]) {
-    for (byte_idx, &byte) in data.iter().enumerate() {
-        let hi_nibble = (byte >> 4) & 0xF;
-        let lo_nibble = byte & 0xF;
-        let base_pos = byte_idx * 2;
-        
-        let alphabet_idx_hi = base_pos & 3;
-        let alphabet_idx_lo = (base_pos + 1) & 3;
-        
-        output[base_pos] = ALPHABETS[alphabet_idx_hi][hi_nibble as usize];
-        output[base_pos + 1] = ALPHABETS[alphabet_idx_lo][lo_nibble as usize];
+    #[cfg(feature = "simd")]
+    if data.len() < SIMD_MIN_BYTES {
+        q64_encode_portable(data, output);
+        return;
+    }
+
+    #[cfg(all(target_arch = "x86_64", feature = "simd"))]
+    {
+        let mut simd_len = 0;
+        if is_x86_feature_detected!("avx2") {
+            simd_len = data.len() & !31;
+            if simd_len >= NON_TEMPORAL_MIN_BYTES {
+                unsafe { q64_encode_avx2_stream(&data[..simd_len], &mut output[..simd_len * 2]) };
+            } else {
+                unsafe { q64_encode_avx2::<false>(&data[..simd_len], &mut output[..simd_len * 2]) };
+            }
+        }
+        // SSSE3 takes 16-byte blocks: the whole input on pre-AVX2 CPUs,
+        // otherwise at most one block left over by the AVX2 kernel
+        if is_x86_feature_detected!("ssse3") {
+            let end = simd_len + ((data.len() - simd_len) & !15);
+            unsafe { q64_encode_ssse3(&data[simd_len..end], &mut output[simd_len * 2..end * 2]) };
+            simd_len = end;
+        }
+        if simd_len > 0 {
+            q64_encode_portable(&data[simd_len..], &mut output[simd_len * 2..]);
+            return;
+        }
+    }
+
+    #[cfg(all(target_arch = "aarch64", feature = "simd"))]
+    {
+        if std::arch::is_aarch64_feature_detected!("neon") {
+            let simd_len = data.len() & !15;
+            unsafe { q64_encode_neon(&data[..simd_len], &mut output[..simd_len * 2]) };
+            q64_encode_portable(&data[simd_len..], &mut output[simd_len * 2..]);
+            return;
+        }
+    }
+
+    q64_encode_portable(data, output);
+}
+
+/// Character pairs for every byte value, one table per byte parity
+///
+/// `Q64_PAIRS[0][b]` is the encoding of `b` at an even input position
+/// (alphabets 0/1) and `Q64_PAIRS[1][b]` at an odd one (alphabets 2/3).
+/// The whole table is 1 KiB, so it stays in L1 during a batch.
+static Q64_PAIRS: [[[u8; 2]; 256]; 2] = [build_pair_table(0), build_pair_table(2)];
+
+const fn build_pair_table(first: usize) -> [[u8; 2]; 256] {
+    let mut table = [[0u8; 2]; 256];
+    let mut byte = 0;
+    while byte < 256 {
+        table[byte] = [ALPHABETS[first][byte >> 4], ALPHABETS[first + 1][byte & 0xF]];
+        byte += 1;
+    }
+    table
+}
+
+/// Portable implementation: one table load per input byte
+///
+/// Two input bytes (one even, one odd position) produce four output
+/// characters per iteration; an odd trailing byte is always at an even
+/// position.
+fn q64_encode_portable(data: &[u8], output: &mut [u8]) {
+    let pairs = data.chunks_exact(2);
+    let tail = pairs.remainder();
+    for (chunk, out) in pairs.zip(output.chunks_exact_mut(4)) {
+        out[..2].copy_from_slice(&Q64_PAIRS[0][chunk[0] as usize]);
+        out[2..].copy_from_slice(&Q64_PAIRS[1][chunk[1] as usize]);
+    }
+    if let &[byte] = tail {
+        let pos = (data.len() - 1) * 2;
+        output[pos..pos + 2].copy_from_slice(&Q64_PAIRS[0][byte as usize]);
     }
 }
 
-/// Scalar implementation of Q64 encoding
-#[cfg(not(all(target_arch = "x86_64", feature = "simd")))]
-fn q64_encode_scalar(data: &[u8], output: &mut String) {
+/// Reference implementation of Q64 encoding, one nibble at a time
+#[cfg(test)]
+fn q64_encode_scalar(data: &[u8], output: &mut [u8]) {
     for (byte_idx, &byte) in data.iter().enumerate() {
         let hi_nibble = (byte >> 4) & 0xF;
         let lo_nibble = byte & 0xF;
         let base_pos = byte_idx * 2;
 
         // Use position-dependent alphabets
-        output.push(ALPHABETS[base_pos & 3][hi_nibble as usize] as char);
-        output.push(ALPHABETS[(base_pos + 1) & 3][lo_nibble as usize] as char);
+        output[base_pos] = ALPHABETS[base_pos & 3][hi_nibble as usize];
+        output[base_pos + 1] = ALPHABETS[(base_pos + 1) & 3][lo_nibble as usize];
     }
 }
 
-/// SIMD implementation for x86_64 with SSE2
-/// 
+/// AVX2 implementation: 32 input bytes -> 64 output characters per iteration
+///
+/// Each alphabet is a 16-entry table, so `vpshufb` maps a whole vector of
+/// nibbles to characters at once. Even input bytes use alphabets 0/1 and odd
+/// bytes use alphabets 2/3; the two lookups are merged with a blend mask.
+/// With `STREAM`, the output is written with non-temporal stores.
+///
 /// # Safety
 /// This function is safe to call when:
-/// - The target CPU supports SSE2 (checked at compile time via cfg)
-/// - The input slice `data` is valid for its entire length
-/// - The output string has sufficient capacity (pre-allocated by caller)
-/// 
-/// The unsafe operations performed are:
-/// - Loading unaligned data via _mm_loadu_si128 (safe for any alignment)
-/// - Using SIMD intrinsics (safe when target_arch requirements are met)
+/// - The CPU supports AVX2 (checked at runtime by the caller)
+/// - `data.len()` is a multiple of 32
+/// - `output.len()` is at least `data.len() * 2`
+/// - With `STREAM`, `output` is 32-byte aligned
 #[cfg(all(target_arch = "x86_64", feature = "simd"))]
-unsafe fn q64_encode_simd(data: &[u8], output: &mut String) {
-    #[cfg(target_arch = "x86_64")]
+#[target_feature(enable = "avx2")]
+unsafe fn q64_encode_avx2<const STREAM: bool>(data: &[u8], output: &mut [u8]) {
     use std::arch::x86_64::*;
 
-    let chunks = data.chunks_exact(16);
-    let remainder = chunks.remainder();
+    // Broadcast each alphabet to both 128-bit lanes (vpshufb is lane-local)
+    let lut0 = _mm256_broadcastsi128_si256(_mm_load_si128(SIMD_LUT.0[0].as_ptr() as *const __m128i));
+    let lut1 = _mm256_broadcastsi128_si256(_mm_load_si128(SIMD_LUT.0[1].as_ptr() as *const __m128i));
+    let lut2 = _mm256_broadcastsi128_si256(_mm_load_si128(SIMD_LUT.0[2].as_ptr() as *const __m128i));
+    let lut3 = _mm256_broadcastsi128_si256(_mm_load_si128(SIMD_LUT.0[3].as_ptr() as *const __m128i));
 
-    // Process 16 bytes at a time
-    for (chunk_idx, chunk) in chunks.enumerate() {
-        // Load 16 bytes
-        let input = _mm_loadu_si128(chunk.as_ptr() as *const __m128i);
+    let nibble_mask = _mm256_set1_epi8(0x0F);
+    // 0xFF on odd byte positions
+    let odd_bytes = _mm256_set1_epi16(0xFF00u16 as i16);
+
+    for (chunk, out) in data.chunks_exact(32).zip(output.chunks_exact_mut(64)) {
+        let input = _mm256_loadu_si256(chunk.as_ptr() as *const __m256i);
 
         // Split into high and low nibbles
-        let lo_mask = _mm_set1_epi8(0x0F);
+        let hi = _mm256_and_si256(_mm256_srli_epi16(input, 4), nibble_mask);
+        let lo = _mm256_and_si256(input, nibble_mask);
+
+        // Look up both candidate alphabets and select by byte parity
+        let hi_chars = _mm256_blendv_epi8(
+            _mm256_shuffle_epi8(lut0, hi),
+            _mm256_shuffle_epi8(lut2, hi),
+            odd_bytes,
+        );
+        let lo_chars = _mm256_blendv_epi8(
+            _mm256_shuffle_epi8(lut1, lo),
+            _mm256_shuffle_epi8(lut3, lo),
+            odd_bytes,
+        );
+
+        // Interleave hi/lo characters; unpack works per lane, so
+        // `first` holds bytes 0-7 | 16-23 and `second` bytes 8-15 | 24-31
+        let first = _mm256_unpacklo_epi8(hi_chars, lo_chars);
+        let second = _mm256_unpackhi_epi8(hi_chars, lo_chars);
+
+        let low = _mm256_permute2x128_si256(first, second, 0x20);
+        let high = _mm256_permute2x128_si256(first, second, 0x31);
+
+        let out_ptr = out.as_mut_ptr() as *mut __m256i;
+        if STREAM {
+            _mm256_stream_si256(out_ptr, low);
+            _mm256_stream_si256(out_ptr.add(1), high);
+        } else {
+            _mm256_storeu_si256(out_ptr, low);
+            _mm256_storeu_si256(out_ptr.add(1), high);
+        }
+    }
+
+    if STREAM {
+        // Order the streaming stores before any later store to the output
+        _mm_sfence();
+    }
+}
+
+/// AVX2 encoding with non-temporal stores, for outputs much larger than cache
+///
+/// Streaming stores need a 32-byte aligned destination, so a short head is
+/// encoded with the portable path first. To keep the alphabet parity the head
+/// must be an even number of input bytes, which needs a 4-byte aligned
+/// output; otherwise this falls back to regular stores.
+///
+/// # Safety
+/// Same requirements as `q64_encode_avx2`, without the alignment one.
+#[cfg(all(target_arch = "x86_64", feature = "simd"))]
+#[target_feature(enable = "avx2")]
+unsafe fn q64_encode_avx2_stream(data: &[u8], output: &mut [u8]) {
+    let misalign = output.as_ptr() as usize % 32;
+    if misalign % 4 != 0 {
+        q64_encode_avx2::<false>(data, output);
+        return;
+    }
 
-        let hi_nibbles = _mm_and_si128(_mm_srli_epi16(input, 4), lo_mask);
-        let lo_nibbles = _mm_and_si128(input, lo_mask);
+    let head = ((32 - misalign) % 32 / 2).min(data.len());
+    let body_end = head + ((data.len() - head) & !31);
+    q64_encode_portable(&data[..head], &mut output[..head * 2]);
+    q64_encode_avx2::<true>(&data[head..body_end], &mut output[head * 2..body_end * 2]);
+    q64_encode_portable(&data[body_end..], &mut output[body_end * 2..]);
+}
 
-        // Process nibbles and convert to characters
-        let base_pos = chunk_idx * 32;
+/// SSSE3 implementation: 16 input bytes -> 32 output characters per iteration
+///
+/// Same scheme as the AVX2 kernel on a single 128-bit lane; without SSE4.1's
+/// `pblendvb` the two alphabet lookups are merged with and/andnot/or.
+///
+/// # Safety
+/// This function is safe to call when:
+/// - The CPU supports SSSE3 (checked at runtime by the caller)
+/// - `data.len()` is a multiple of 16
+/// - `output.len()` is at least `data.len() * 2`
+#[cfg(all(target_arch = "x86_64", feature = "simd"))]
+#[target_feature(enable = "ssse3")]
+unsafe fn q64_encode_ssse3(data: &[u8], output: &mut [u8]) {
+    use std::arch::x86_64::*;
 
-        // Convert SIMD registers to byte arrays for efficient processing
-        let hi_bytes: [u8; 16] = std::mem::transmute(hi_nibbles);
-        let lo_bytes: [u8; 16] = std::mem::transmute(lo_nibbles);
+    let lut0 = _mm_load_si128(SIMD_LUT.0[0].as_ptr() as *const __m128i);
+    let lut1 = _mm_load_si128(SIMD_LUT.0[1].as_ptr() as *const __m128i);
+    let lut2 = _mm_load_si128(SIMD_LUT.0[2].as_ptr() as *const __m128i);
+    let lut3 = _mm_load_si128(SIMD_LUT.0[3].as_ptr() as *const __m128i);
 
-        // Process each byte pair
-        for i in 0..16 {
-            let hi = hi_bytes[i] as usize;
-            let lo = lo_bytes[i] as usize;
+    let nibble_mask = _mm_set1_epi8(0x0F);
+    // 0xFF on odd byte positions
+    let odd_bytes = _mm_set1_epi16(0xFF00u16 as i16);
 
-            let pos = base_pos + i * 2;
-            output.push(ALPHABETS[pos & 3][hi] as char);
-            output.push(ALPHABETS[(pos + 1) & 3][lo] as char);
-        }
+    for (chunk, out) in data.chunks_exact(16).zip(output.chunks_exact_mut(32)) {
+        let input = _mm_loadu_si128(chunk.as_ptr() as *const __m128i);
+
+        // Split into high and low nibbles
+        let hi = _mm_and_si128(_mm_srli_epi16(input, 4), nibble_mask);
+        let lo = _mm_and_si128(input, nibble_mask);
+
+        // Look up both candidate alphabets and select by byte parity
+        let hi_chars = _mm_or_si128(
+            _mm_andnot_si128(odd_bytes, _mm_shuffle_epi8(lut0, hi)),
+            _mm_and_si128(odd_bytes, _mm_shuffle_epi8(lut2, hi)),
+        );
+        let lo_chars = _mm_or_si128(
+            _mm_andnot_si128(odd_bytes, _mm_shuffle_epi8(lut1, lo)),
+            _mm_and_si128(odd_bytes, _mm_shuffle_epi8(lut3, lo)),
+        );
+
+        // Interleave hi/lo characters
+        let out_ptr = out.as_mut_ptr() as *mut __m128i;
+        _mm_storeu_si128(out_ptr, _mm_unpacklo_epi8(hi_chars, lo_chars));
+        _mm_storeu_si128(out_ptr.add(1), _mm_unpackhi_epi8(hi_chars, lo_chars));
     }
+}
 
-    // Handle remainder with scalar code
-    let byte_offset = data.len() - remainder.len();
-    for (idx, &byte) in remainder.iter().enumerate() {
-        let byte_idx = byte_offset + idx;
-        let hi_nibble = (byte >> 4) & 0xF;
-        let lo_nibble = byte & 0xF;
-        let base_pos = byte_idx * 2;
+/// NEON implementation (ARM64): 16 input bytes -> 32 output characters per iteration
+///
+/// Same scheme as the AVX2 kernel using `tbl` lookups; `vst2q_u8` interleaves
+/// the high- and low-nibble characters while storing.
+///
+/// # Safety
+/// This function is safe to call when:
+/// - The CPU supports NEON (baseline on AArch64)
+/// - `data.len()` is a multiple of 16
+/// - `output.len()` is at least `data.len() * 2`
+#[cfg(all(target_arch = "aarch64", feature = "simd"))]
+#[target_feature(enable = "neon")]
+unsafe fn q64_encode_neon(data: &[u8], output: &mut [u8]) {
+    use std::arch::aarch64::*;
+
+    let lut0 = vld1q_u8(SIMD_LUT.0[0].as_ptr());
+    let lut1 = vld1q_u8(SIMD_LUT.0[1].as_ptr());
+    let lut2 = vld1q_u8(SIMD_LUT.0[2].as_ptr());
+    let lut3 = vld1q_u8(SIMD_LUT.0[3].as_ptr());
+
+    let nibble_mask = vdupq_n_u8(0x0F);
+    // 0xFF on odd byte positions
+    let odd_bytes = vreinterpretq_u8_u16(vdupq_n_u16(0xFF00));
+
+    for (chunk, out) in data.chunks_exact(16).zip(output.chunks_exact_mut(32)) {
+        let input = vld1q_u8(chunk.as_ptr());
+
+        // Split into high and low nibbles
+        let hi = vshrq_n_u8(input, 4);
+        let lo = vandq_u8(input, nibble_mask);
+
+        // Look up both candidate alphabets and select by byte parity
+        let hi_chars = vbslq_u8(odd_bytes, vqtbl1q_u8(lut2, hi), vqtbl1q_u8(lut0, hi));
+        let lo_chars = vbslq_u8(odd_bytes, vqtbl1q_u8(lut3, lo), vqtbl1q_u8(lut1, lo));
 
-        output.push(ALPHABETS[base_pos & 3][hi_nibble as usize] as char);
-        output.push(ALPHABETS[(base_pos + 1) & 3][lo_nibble as usize] as char);
+        vst2q_u8(out.as_mut_ptr(), uint8x16x2_t(hi_chars, lo_chars));
     }
 }
 
 /// Decode Q64 string back to bytes
 pub fn q64_decode(encoded: &str) -> Result<Vec<u8>, Q64Error> {
+    let mut result = vec![0u8; encoded.len() / 2];
+    q64_decode_into(encoded.as_bytes(), &mut result)?;
+    Ok(result)
+}
+
+/// Zero-copy version: decode Q64 text into a pre-allocated buffer.
+///
+/// # Arguments
+/// * `encoded` - Q64 characters as ASCII bytes
+/// * `output` - Pre-allocated byte buffer (must be at least `encoded.len() / 2` bytes)
+///
+/// # Returns
+/// * `Ok(bytes_written)` - Number of bytes written to output buffer
+/// * `Err(Q64Error)` - If the input is malformed or the output buffer is too small
+pub fn q64_decode_into(encoded: &[u8], output: &mut [u8]) -> Result<usize, Q64Error> {
     if encoded.len() & 1 != 0 {
         return Err(Q64Error {
             message: "Q64 string length must be even".to_string(),
         });
     }
 
-    let mut result = Vec::with_capacity(encoded.len() / 2);
-    let chars: Vec<char> = encoded.chars().collect();
-
-    for (pos, chunk) in chars.chunks_exact(2).enumerate() {
-        let ch1 = chunk[0];
-        let ch2 = chunk[1];
-
-        // Validate and decode first nibble
-        let (_, nibble1) = validate_char(ch1, pos * 2)?;
+    let decoded_len = encoded.len() / 2;
+    if output.len() < decoded_len {
+        return Err(Q64Error {
+            message: format!(
+                "Output buffer too small: need {} bytes, got {}",
+                decoded_len,
+                output.len()
+            ),
+        });
+    }
 
-        // Validate and decode second nibble
-        let (_, nibble2) = validate_char(ch2, pos * 2 + 1)?;
+    for (pos, (pair, out)) in encoded.chunks_exact(2).zip(output.iter_mut()).enumerate() {
+        // Validate and decode both nibbles
+        let (_, nibble1) = validate_byte(pair[0], pos * 2)?;
+        let (_, nibble2) = validate_byte(pair[1], pos * 2 + 1)?;
 
         // Combine nibbles into byte
-        result.push((nibble1 << 4) | nibble2);
+        *out = (nibble1 << 4) | nibble2;
     }
 
-    Ok(result)
+    Ok(decoded_len)
+}
+
+/// Validate one encoded byte and return (alphabet_idx, nibble_value)
+fn validate_byte(byte: u8, pos: usize) -> Result<(u8, u8), Q64Error> {
+    if !byte.is_ascii() {
+        return Err(Q64Error {
+            message: format!("Non-ASCII byte 0x{:02X} at position {}", byte, pos),
+        });
+    }
+    validate_char(byte as char, pos)
 }
 
 /// Validate character and return (alphabet_idx, nibble_value)
@@ -261,6 +510,33 @@ mod tests {
         assert_eq!(data, decoded);
     }
 
+    #[test]
+    fn test_encode_into() {
+        let data: Vec<u8> = (0..=255).collect();
+        let mut output = vec![0u8; data.len() * 2];
+        q64_encode_into(&data, &mut output);
+        assert_eq!(output, q64_encode(&data).into_bytes());
+    }
+
+    #[test]
+    fn test_decode_into() {
+        let data: Vec<u8> = (0..=255).collect();
+        let encoded = q64_encode(&data);
+
+        let mut output = vec![0u8; data.len()];
+        assert_eq!(q64_decode_into(encoded.as_bytes(), &mut output).unwrap(), data.len());
+        assert_eq!(output, data);
+
+        assert!(q64_decode_into(encoded.as_bytes(), &mut output[..10]).is_err());
+        assert!(q64_decode_into("A\u{e9}".as_bytes(), &mut output).is_err());
+    }
+
+    #[test]
+    #[should_panic(expected = "Output buffer too small")]
+    fn test_encode_into_short_output() {
+        q64_encode_into(&[1, 2, 3], &mut [0u8; 5]);
+    }
+
     #[test]
     fn test_position_safety() {
         let data = vec![0, 0, 0, 0];
@@ -329,6 +605,48 @@ mod tests {
         assert_eq!(bytes_written, 0);
     }
 
+    #[test]
+    fn test_simd_matches_scalar() {
+        // Cover empty input, sub-vector tails and multiple full SIMD blocks
+        for len in (0..=130).chain([1000, 4099]) {
+            let data: Vec<u8> = (0..len).map(|i| (i * 131 + 7) as u8).collect();
+
+            let mut expected = vec![0u8; len * 2];
+            q64_encode_scalar(&data, &mut expected);
+
+            let mut buffer = vec![0u8; len * 2];
+            q64_encode_portable(&data, &mut buffer);
+            assert_eq!(buffer, expected, "portable mismatch for length {}", len);
+
+            q64_encode_to_buffer(&data, &mut buffer).unwrap();
+            assert_eq!(buffer, expected, "mismatch for length {}", len);
+            assert_eq!(q64_encode(&data).as_bytes(), &expected[..]);
+
+            // The dispatcher only hands SSSE3 whole inputs on pre-AVX2 CPUs
+            #[cfg(all(target_arch = "x86_64", feature = "simd"))]
+            if is_x86_feature_detected!("ssse3") {
+                let ssse3_len = len & !15;
+                buffer.fill(0);
+                unsafe { q64_encode_ssse3(&data[..ssse3_len], &mut buffer[..ssse3_len * 2]) };
+                assert_eq!(buffer[..ssse3_len * 2], expected[..ssse3_len * 2], "SSSE3 mismatch for length {}", len);
+            }
+
+            // The streaming kernel only runs on huge inputs; check it directly
+            // at every output alignment it has to handle
+            #[cfg(all(target_arch = "x86_64", feature = "simd"))]
+            if is_x86_feature_detected!("avx2") {
+                let avx2_len = len & !31;
+                let mut padded = vec![0u8; avx2_len * 2 + 32];
+                for offset in 0..8 {
+                    let out = &mut padded[offset..offset + avx2_len * 2];
+                    out.fill(0);
+                    unsafe { q64_encode_avx2_stream(&data[..avx2_len], out) };
+                    assert_eq!(out, &expected[..avx2_len * 2], "stream mismatch for length {}", len);
+                }
+            }
+        }
+    }
+
     #[test]
     fn test_zero_copy_consistency() {
         let test_data = (0..100).collect::<Vec<u8>>();
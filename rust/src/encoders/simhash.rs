@@ -3,12 +3,12 @@
 
 use rayon::prelude::*;
 use once_cell::sync::Lazy;
-use std::sync::Mutex;
+use std::sync::{Arc, Mutex};
 use std::collections::HashMap;
 use super::q64::Q64Error;
 
 /// Cache for projection matrices of different sizes
-static MATRIX_CACHE: Lazy<Mutex<HashMap<(usize, usize), ProjectionMatrix>>> =
+static MATRIX_CACHE: Lazy<Mutex<HashMap<(usize, usize), Arc<ProjectionMatrix>>>> =
     Lazy::new(|| Mutex::new(HashMap::new()));
 
 /// Random projection matrix for SimHash
@@ -39,11 +39,11 @@ impl ProjectionMatrix {
         Self { data, planes, dims }
     }
 
-    /// Get cached matrix or create new one
-    fn get_or_create(planes: usize, dims: usize) -> ProjectionMatrix {
+    /// Get cached matrix or create new one (shared, not copied)
+    fn get_or_create(planes: usize, dims: usize) -> Arc<ProjectionMatrix> {
         let mut cache = MATRIX_CACHE.lock().unwrap();
         cache.entry((planes, dims))
-            .or_insert_with(|| ProjectionMatrix::new(planes, dims))
+            .or_insert_with(|| Arc::new(ProjectionMatrix::new(planes, dims)))
             .clone()
     }
 
@@ -74,6 +74,37 @@ impl ProjectionMatrix {
     }
 }
 
+/// Pack hash bits (first bit = MSB of the first byte) and Q64-encode them
+/// straight into `output`, which must hold `2 * ceil(bits / 8)` bytes
+///
+/// Bits are gathered 64 at a time into a word whose 8 bytes are encoded with
+/// four byte-pair table lookups; a partial last word is zero-padded to whole
+/// bytes. Every full word starts on an even byte index, so each can be
+/// encoded on its own.
+fn encode_bits_q64(bits: impl IntoIterator<Item = bool>, output: &mut [u8]) {
+    let mut word = 0u64;
+    let mut count = 0;
+    let mut written = 0;
+
+    for bit in bits {
+        word = (word << 1) | bit as u64;
+        count += 1;
+        if count == 64 {
+            super::q64::q64_encode_into(&word.to_be_bytes(), &mut output[written..written + 16]);
+            written += 16;
+            word = 0;
+            count = 0;
+        }
+    }
+
+    if count > 0 {
+        let tail_bytes = (count + 7) / 8;
+        let word = word << (tail_bytes * 8 - count);
+        let bytes = word.to_be_bytes();
+        super::q64::q64_encode_into(&bytes[8 - tail_bytes..], &mut output[written..written + tail_bytes * 2]);
+    }
+}
+
 /// Generate SimHash with Q64 encoding
 ///
 /// # Algorithm
@@ -88,20 +119,12 @@ pub fn simhash_q64(embedding: &[u8], planes: usize) -> String {
     // Project and get bits
     let bits = matrix.project(embedding);
 
-    // Pack bits into bytes
-    let mut bytes = Vec::with_capacity((bits.len() + 7) / 8);
-    for chunk in bits.chunks(8) {
-        let mut byte = 0u8;
-        for (i, &bit) in chunk.iter().enumerate() {
-            if bit {
-                byte |= 1 << (7 - i);
-            }
-        }
-        bytes.push(byte);
-    }
+    // Pack bits and encode with Q64 in one pass
+    let mut encoded = vec![0u8; (bits.len() + 7) / 8 * 2];
+    encode_bits_q64(bits, &mut encoded);
 
-    // Encode with Q64
-    super::q64::q64_encode(&bytes)
+    // Every Q64 alphabet character is ASCII
+    unsafe { String::from_utf8_unchecked(encoded) }
 }
 
 /// Zero-copy version: Generate SimHash with Q64 encoding into pre-allocated buffer
@@ -122,11 +145,17 @@ pub fn simhash_to_buffer(embedding: &[u8], planes: usize, output: &mut [u8]) ->
     // Get or generate projection matrix
     let matrix = ProjectionMatrix::get_or_create(planes, embedding.len());
     
-    // Calculate hash
-    let mut bits = vec![false; planes];
+    let bytes_needed = (planes + 7) / 8;
+    let q64_needed = bytes_needed * 2;  // Q64 doubles the size
+    
+    if output.len() < q64_needed {
+        return Err(Q64Error {
+            message: format!("Output buffer too small: need {} bytes, got {}", q64_needed, output.len())
+        });
+    }
     
-    // Compute dot products
-    for plane_idx in 0..planes {
+    // Compute dot products, feeding each sign bit straight into the Q64 packer
+    let bits = (0..planes).map(|plane_idx| {
         let offset = plane_idx * embedding.len();
         let plane = &matrix.data[offset..offset + embedding.len()];
         
@@ -135,33 +164,9 @@ pub fn simhash_to_buffer(embedding: &[u8], planes: usize, output: &mut [u8]) ->
             .map(|(&e, &p)| (e as f32 - 128.0) * p)
             .sum();
         
-        bits[plane_idx] = dot >= 0.0;
-    }
-    
-    // Pack bits directly into output buffer
-    let bytes_needed = (bits.len() + 7) / 8;
-    let q64_needed = bytes_needed * 2;  // Q64 doubles the size
-    
-    if output.len() < q64_needed {
-        return Err(Q64Error {
-            message: format!("Output buffer too small: need {} bytes, got {}", q64_needed, output.len())
-        });
-    }
-    
-    // Pack bits into temporary bytes
-    let mut temp_bytes = [0u8; 128]; // Max 1024 planes = 128 bytes
-    for (byte_idx, chunk) in bits.chunks(8).enumerate() {
-        let mut byte = 0u8;
-        for (i, &bit) in chunk.iter().enumerate() {
-            if bit {
-                byte |= 1 << (7 - i);
-            }
-        }
-        temp_bytes[byte_idx] = byte;
-    }
-    
-    // Encode directly to output buffer
-    super::q64::q64_encode_to_buffer(&temp_bytes[..bytes_needed], output)?;
+        dot >= 0.0
+    });
+    encode_bits_q64(bits, &mut output[..q64_needed]);
     
     Ok(q64_needed)
 }
@@ -188,21 +193,9 @@ pub fn simhash_q64_to_buffer(
     // Project and get bits
     let bits = matrix.project(embedding);
 
-    // Pack bits into bytes directly in a temporary buffer
-    let mut hash_bytes_buf = vec![0u8; hash_bytes];
-    for (chunk_idx, chunk) in bits.chunks(8).enumerate() {
-        let mut byte = 0u8;
-        for (i, &bit) in chunk.iter().enumerate() {
-            if bit {
-                byte |= 1 << (7 - i);
-            }
-        }
-        hash_bytes_buf[chunk_idx] = byte;
-    }
-
-    // Encode with Q64 directly to output buffer
-    super::q64::q64_encode_to_buffer(&hash_bytes_buf, output)
-        .map_err(|e| e.to_string())
+    // Pack bits and encode with Q64 directly to output buffer
+    encode_bits_q64(bits, &mut output[..required_len]);
+    Ok(required_len)
 }
 
 #[cfg(test)]
@@ -249,4 +242,20 @@ mod tests {
         let hash = simhash_q64(&embedding, 64);
         assert_eq!(hash.len(), 16); // 64 bits = 8 bytes = 16 q64 chars
     }
+
+    #[test]
+    fn test_encode_bits_matches_byte_packing() {
+        for count in [1usize, 7, 8, 9, 63, 64, 65, 128, 130, 1024] {
+            let bits: Vec<bool> = (0..count).map(|i| (i * 7 + i / 3) % 5 < 2).collect();
+
+            // Reference: pack MSB-first into bytes, then Q64-encode
+            let bytes: Vec<u8> = bits.chunks(8)
+                .map(|chunk| chunk.iter().enumerate().fold(0u8, |b, (i, &bit)| b | ((bit as u8) << (7 - i))))
+                .collect();
+
+            let mut output = vec![0u8; bytes.len() * 2];
+            encode_bits_q64(bits.iter().copied(), &mut output);
+            assert_eq!(output, super::super::q64::q64_encode(&bytes).into_bytes(), "{} bits", count);
+        }
+    }
 }
\ No newline at end of file
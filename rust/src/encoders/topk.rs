@@ -2,6 +2,7 @@
 /// Top-k indices encoder for sparse representation.
 
 use rayon::prelude::*;
+use super::topk_optimized::{rank_index, rank_key};
 
 /// Find top k indices with highest values
 ///
@@ -17,23 +18,25 @@ pub fn top_k_indices(embedding: &[u8], k: usize) -> Vec<u8> {
 }
 
 /// Fast implementation for embeddings that fit in a u8 index
+///
+/// Ties between equal values go to the lower index, as in `topk_optimized`.
 fn top_k_indices_small(embedding: &[u8], k: usize) -> Vec<u8> {
-    let mut indexed: Vec<(u8, u8)> = embedding
+    let mut keys: Vec<u64> = embedding
         .iter()
         .enumerate()
-        .map(|(idx, &val)| (val, idx as u8))
+        .map(|(idx, &val)| rank_key(val, idx))
         .collect();
 
     // Partial sort to get top k
-    let k_clamped = k.min(indexed.len());
+    let k_clamped = k.min(keys.len());
     if k_clamped > 0 {
-        indexed.select_nth_unstable_by(k_clamped - 1, |a, b| b.0.cmp(&a.0));
+        keys.select_nth_unstable_by(k_clamped - 1, |a, b| b.cmp(a));
     }
 
     // Extract indices and sort them
-    let mut indices: Vec<u8> = indexed[..k_clamped]
+    let mut indices: Vec<u8> = keys[..k_clamped]
         .iter()
-        .map(|(_, idx)| *idx)
+        .map(|&key| rank_index(key) as u8)
         .collect();
     indices.sort_unstable();
 
@@ -51,20 +54,21 @@ fn top_k_indices_parallel(embedding: &[u8], k: usize) -> Vec<u8> {
         .enumerate()
         .collect();
 
-    // Find top candidates from each chunk in parallel
-    let candidates: Vec<(u8, usize)> = chunks
+    // Find top candidates from each chunk in parallel; ties go to the lower
+    // index, both within a chunk and in the final selection
+    let candidates: Vec<u64> = chunks
         .par_iter()
         .flat_map(|(chunk_idx, chunk)| {
-            let mut local_top: Vec<(u8, usize)> = chunk
+            let mut local_top: Vec<u64> = chunk
                 .iter()
                 .enumerate()
-                .map(|(idx, &val)| (val, chunk_idx * chunk_size + idx))
+                .map(|(idx, &val)| rank_key(val, chunk_idx * chunk_size + idx))
                 .collect();
 
             // Keep top k from each chunk
             let local_k = k.min(local_top.len());
             if local_k > 0 {
-                local_top.select_nth_unstable_by(local_k - 1, |a, b| b.0.cmp(&a.0));
+                local_top.select_nth_unstable_by(local_k - 1, |a, b| b.cmp(a));
                 local_top.truncate(local_k);
             }
             local_top
@@ -75,13 +79,13 @@ fn top_k_indices_parallel(embedding: &[u8], k: usize) -> Vec<u8> {
     let mut final_candidates = candidates;
     let final_k = k.min(final_candidates.len());
     if final_k > 0 {
-        final_candidates.select_nth_unstable_by(final_k - 1, |a, b| b.0.cmp(&a.0));
+        final_candidates.select_nth_unstable_by(final_k - 1, |a, b| b.cmp(a));
     }
 
     // Extract indices, handle large indices
     let mut indices: Vec<u8> = final_candidates[..final_k]
         .iter()
-        .map(|(_, idx)| (*idx).min(255) as u8)
+        .map(|&key| rank_index(key).min(255) as u8)
         .collect();
     indices.sort_unstable();
 
@@ -134,6 +138,21 @@ mod tests {
         assert!(top3.contains(&255)); // 299 clamped to 255
     }
 
+    #[test]
+    fn test_ties_match_optimized() {
+        // Few distinct values, so every selection boundary falls inside a tie
+        for &len in &[200usize, 768, 1000] {
+            let data: Vec<u8> = (0..len).map(|i| ((i * 37 + i / 7) % 5) as u8).collect();
+            for &k in &[1usize, 10, 64, 300] {
+                assert_eq!(
+                    top_k_indices(&data, k),
+                    super::super::topk_optimized::top_k_indices_optimized(&data, k),
+                    "len {} k {}", len, k
+                );
+            }
+        }
+    }
+
     #[test]
     fn test_top_k_q64_length() {
         let data = vec![10, 50, 30, 80, 20, 90, 40, 70];
@@ -2,6 +2,7 @@
 /// Optimized Top-k indices encoder with SIMD and memory optimizations.
 
 use rayon::prelude::*;
+use std::cell::RefCell;
 use std::cmp::Reverse;
 
 /// Find top k indices with highest values - optimized version
@@ -21,39 +22,102 @@ pub fn top_k_indices_optimized(embedding: &[u8], k: usize) -> Vec<u8> {
     if len <= 256 {
         // Optimized small path
         top_k_indices_small_optimized(embedding, k)
-    } else if k <= 16 {
-        // For small k, use heap-based approach
+    } else if prefer_heap(len, k) {
+        // For k small relative to n, a heap rejects most values with one compare
         top_k_indices_heap(embedding, k)
+    } else if len < PARALLEL_MIN_LEN {
+        // Linear-time quickselect for mid-sized embeddings
+        top_k_indices_select(embedding, k)
     } else {
         // Parallel path with improved chunking
         top_k_indices_parallel_optimized(embedding, k)
     }
 }
 
+/// Embeddings at least this long are split across threads
+const PARALLEL_MIN_LEN: usize = 1 << 16;
+
+/// Whether a bounded heap (O(n log k), cheap rejections) beats quickselect
+/// (O(n) with a larger constant); measured crossover is near `8 k log2(n) = n`
+fn prefer_heap(len: usize, k: usize) -> bool {
+    let log2_len = (usize::BITS - len.leading_zeros()) as usize;
+    k.saturating_mul(log2_len).saturating_mul(8) < len
+}
+
+/// Low bits of a rank key that hold the inverted index
+const RANK_INDEX_MASK: u64 = (1 << 56) - 1;
+
+/// Ranking key: higher values rank first, ties go to the lower index
+///
+/// Every path, including the original encoder in `topk.rs`, orders candidates
+/// this way (quickselect uses the same layout in a `u32`), so the selected
+/// indices never depend on which path is taken.
+#[inline(always)]
+pub(crate) fn rank_key(val: u8, idx: usize) -> u64 {
+    ((val as u64) << 56) | (RANK_INDEX_MASK - idx as u64)
+}
+
+/// Index encoded in a rank key
+#[inline(always)]
+pub(crate) fn rank_index(key: u64) -> usize {
+    (RANK_INDEX_MASK - (key & RANK_INDEX_MASK)) as usize
+}
+
+thread_local! {
+    /// Per-thread key buffer for `top_k_indices_select`
+    ///
+    /// Batch workers run one selection per embedding, so reusing the buffer
+    /// keeps allocations at one per thread instead of one per embedding. Its
+    /// size is bounded by `PARALLEL_MIN_LEN` keys.
+    static SELECT_KEYS: RefCell<Vec<u32>> = RefCell::new(Vec::new());
+}
+
+/// Quickselect over packed `(value, index)` keys
+///
+/// Each key holds the value in its top 8 bits and the inverted index in the
+/// low 24, so selection compares plain integers and ties go to the lower
+/// index. Requires `embedding.len() <= 1 << 24`.
+fn top_k_indices_select(embedding: &[u8], k: usize) -> Vec<u8> {
+    const INDEX_MASK: u32 = 0xFF_FFFF;
+    debug_assert!(embedding.len() <= 1 << 24);
+    
+    let k_clamped = k.min(embedding.len());
+    let mut indices: Vec<u8> = Vec::with_capacity(k);
+    
+    SELECT_KEYS.with(|keys| {
+        let mut keys = keys.borrow_mut();
+        keys.clear();
+        keys.extend(
+            embedding
+                .iter()
+                .enumerate()
+                .map(|(idx, &val)| ((val as u32) << 24) | (INDEX_MASK - idx as u32)),
+        );
+        
+        if k_clamped > 0 && k_clamped < keys.len() {
+            keys.select_nth_unstable_by(k_clamped - 1, |a, b| b.cmp(a));
+        }
+        
+        // Extract indices, handle large indices
+        indices.extend(
+            keys[..k_clamped]
+                .iter()
+                .map(|&key| ((INDEX_MASK - (key & INDEX_MASK)) as usize).min(255) as u8),
+        );
+    });
+    
+    indices.sort_unstable();
+    indices.resize(k, 255);
+    indices
+}
+
 /// Optimized implementation for small embeddings
 fn top_k_indices_small_optimized(embedding: &[u8], k: usize) -> Vec<u8> {
     let k_clamped = k.min(embedding.len());
     
     // For very small k or when k is close to n, use different strategies
     if k_clamped <= 4 || k_clamped as f32 / embedding.len() as f32 > 0.25 {
-        // Use the original approach for these cases
-        let mut indexed: Vec<(u8, u8)> = embedding
-            .iter()
-            .enumerate()
-            .map(|(idx, &val)| (val, idx as u8))
-            .collect();
-
-        if k_clamped > 0 {
-            indexed.select_nth_unstable_by(k_clamped - 1, |a, b| b.0.cmp(&a.0));
-        }
-
-        let mut indices: Vec<u8> = indexed[..k_clamped]
-            .iter()
-            .map(|(_, idx)| *idx)
-            .collect();
-        indices.sort_unstable();
-        indices.resize(k, 255);
-        return indices;
+        return top_k_indices_select(embedding, k);
     }
     
     // Use heap for other cases
@@ -61,18 +125,15 @@ fn top_k_indices_small_optimized(embedding: &[u8], k: usize) -> Vec<u8> {
     let mut heap = BinaryHeap::with_capacity(k_clamped + 1);
     
     for (idx, &val) in embedding.iter().enumerate() {
-        heap.push(Reverse((val, idx as u8)));
+        heap.push(Reverse(rank_key(val, idx)));
         if heap.len() > k_clamped {
             heap.pop();
         }
     }
     
     // Extract and sort indices
-    let mut indices: Vec<u8> = heap
-        .into_sorted_vec()
-        .into_iter()
-        .map(|Reverse((_, idx))| idx)
-        .collect();
+    let mut indices: Vec<u8> = Vec::with_capacity(k);
+    indices.extend(heap.into_iter().map(|Reverse(key)| rank_index(key) as u8));
     
     indices.sort_unstable();
     indices.resize(k, 255);
@@ -89,22 +150,20 @@ fn top_k_indices_heap(embedding: &[u8], k: usize) -> Vec<u8> {
     let mut heap = BinaryHeap::with_capacity(k_clamped + 1);
     
     for (idx, &val) in embedding.iter().enumerate() {
+        let key = rank_key(val, idx);
         if heap.len() < k_clamped {
-            heap.push(Reverse((val, idx)));
-        } else if let Some(&Reverse((min_val, _))) = heap.peek() {
-            if val > min_val {
+            heap.push(Reverse(key));
+        } else if let Some(&Reverse(min_key)) = heap.peek() {
+            if key > min_key {
                 heap.pop();
-                heap.push(Reverse((val, idx)));
+                heap.push(Reverse(key));
             }
         }
     }
     
     // Extract indices, handle large indices
-    let mut indices: Vec<u8> = heap
-        .into_sorted_vec()
-        .into_iter()
-        .map(|Reverse((_, idx))| idx.min(255) as u8)
-        .collect();
+    let mut indices: Vec<u8> = Vec::with_capacity(k);
+    indices.extend(heap.into_iter().map(|Reverse(key)| rank_index(key).min(255) as u8));
     
     indices.sort_unstable();
     indices.resize(k, 255);
@@ -118,7 +177,7 @@ fn top_k_indices_parallel_optimized(embedding: &[u8], k: usize) -> Vec<u8> {
     let chunk_size = ((embedding.len() + num_threads - 1) / num_threads).max(256);
     
     // Process chunks in parallel with pre-allocated space
-    let candidates: Vec<Vec<(u8, usize)>> = embedding
+    let candidates: Vec<Vec<u64>> = embedding
         .par_chunks(chunk_size)
         .enumerate()
         .map(|(chunk_idx, chunk)| {
@@ -134,16 +193,18 @@ fn top_k_indices_parallel_optimized(embedding: &[u8], k: usize) -> Vec<u8> {
             let mut heap = BinaryHeap::with_capacity(local_k + 1);
             
             for (idx, &val) in chunk.iter().enumerate() {
-                heap.push(Reverse((val, base_idx + idx)));
-                if heap.len() > local_k {
-                    heap.pop();
+                let key = rank_key(val, base_idx + idx);
+                if heap.len() < local_k {
+                    heap.push(Reverse(key));
+                } else if let Some(&Reverse(min_key)) = heap.peek() {
+                    if key > min_key {
+                        heap.pop();
+                        heap.push(Reverse(key));
+                    }
                 }
             }
             
-            heap.into_sorted_vec()
-                .into_iter()
-                .map(|Reverse(item)| item)
-                .collect()
+            heap.into_iter().map(|Reverse(key)| key).collect()
         })
         .collect();
     
@@ -158,14 +219,12 @@ fn top_k_indices_parallel_optimized(embedding: &[u8], k: usize) -> Vec<u8> {
     // Final top-k selection
     let final_k = k.min(all_candidates.len());
     if final_k > 0 {
-        all_candidates.select_nth_unstable_by(final_k - 1, |a, b| b.0.cmp(&a.0));
+        all_candidates.select_nth_unstable_by(final_k - 1, |a, b| b.cmp(a));
     }
     
     // Extract indices with bounds checking
-    let mut indices: Vec<u8> = all_candidates[..final_k]
-        .iter()
-        .map(|(_, idx)| (*idx).min(255) as u8)
-        .collect();
+    let mut indices: Vec<u8> = Vec::with_capacity(k);
+    indices.extend(all_candidates[..final_k].iter().map(|&key| rank_index(key).min(255) as u8));
     
     indices.sort_unstable();
     indices.resize(k, 255);
@@ -224,6 +283,39 @@ mod tests {
         assert_eq!(top3.len(), 3);
     }
 
+    #[test]
+    fn test_select_matches_full_sort() {
+        for &(len, k) in &[(200usize, 10usize), (768, 10), (768, 300), (1000, 1000), (1000, 1200)] {
+            let data: Vec<u8> = (0..len).map(|i| ((i * 73 + 11) % 251) as u8).collect();
+            
+            // Reference: sort by value descending, ties to the lower index
+            let mut order: Vec<usize> = (0..len).collect();
+            order.sort_by(|&a, &b| data[b].cmp(&data[a]).then(a.cmp(&b)));
+            let mut expected: Vec<u8> = order.iter().take(k).map(|&i| i.min(255) as u8).collect();
+            expected.sort_unstable();
+            expected.resize(k, 255);
+            
+            assert_eq!(top_k_indices_select(&data, k), expected, "len {} k {}", len, k);
+        }
+    }
+
+    #[test]
+    fn test_paths_agree_on_ties() {
+        // Few distinct values, so every selection boundary falls inside a tie
+        for &len in &[200usize, 768, 1000] {
+            let data: Vec<u8> = (0..len).map(|i| ((i * 37 + i / 7) % 5) as u8).collect();
+            for &k in &[1usize, 9, 10, 16, 64, 300] {
+                let expected = top_k_indices_select(&data, k);
+                assert_eq!(top_k_indices_heap(&data, k), expected, "heap len {} k {}", len, k);
+                assert_eq!(top_k_indices_parallel_optimized(&data, k), expected, "parallel len {} k {}", len, k);
+                assert_eq!(top_k_indices_optimized(&data, k), expected, "dispatch len {} k {}", len, k);
+                if len <= 256 {
+                    assert_eq!(top_k_indices_small_optimized(&data, k), expected, "small len {} k {}", len, k);
+                }
+            }
+        }
+    }
+
     #[test]
     fn test_parallel_optimized() {
         let mut data = vec![0; 10000];
@@ -2,14 +2,75 @@
 /// Parallel batch encoding operations for high-throughput scenarios.
 
 use rayon::prelude::*;
+use once_cell::sync::Lazy;
+use std::collections::HashMap;
+use std::sync::{Arc, Mutex};
 use crate::encoders::*;
 use crate::error::UubedError;
 
+/// Environment variable overriding the default thread count of batch operations
+pub const NUM_THREADS_ENV: &str = "UUBED_NUM_THREADS";
+
+/// Thread pools keyed by thread count, built once and reused across calls
+static THREAD_POOLS: Lazy<Mutex<HashMap<usize, Arc<rayon::ThreadPool>>>> =
+    Lazy::new(|| Mutex::new(HashMap::new()));
+
+/// Thread count from `UUBED_NUM_THREADS`, read once
+static ENV_NUM_THREADS: Lazy<Option<usize>> = Lazy::new(|| {
+    std::env::var(NUM_THREADS_ENV)
+        .ok()
+        .and_then(|v| v.trim().parse().ok())
+});
+
+/// Minimum number of input bytes encoded per rayon task
+///
+/// Q64 encoding of a single short row takes well under a microsecond, less than
+/// the cost of scheduling it as its own task, so rows are grouped into blocks of
+/// at least this size.
+const MIN_TASK_BYTES: usize = 16 * 1024;
+
+/// Number of rows of length `row_len` that make up one Q64 task
+fn rows_per_task(row_len: usize) -> usize {
+    (MIN_TASK_BYTES / row_len.max(1)).max(1)
+}
+
+/// Get the cached thread pool for `num_threads` workers, creating it on first use
+fn thread_pool(num_threads: usize) -> Arc<rayon::ThreadPool> {
+    let mut pools = THREAD_POOLS.lock().unwrap();
+    pools.entry(num_threads)
+        .or_insert_with(|| {
+            Arc::new(
+                rayon::ThreadPoolBuilder::new()
+                    .num_threads(num_threads)
+                    .build()
+                    .unwrap()
+            )
+        })
+        .clone()
+}
+
+/// Run `op` with the requested parallelism
+///
+/// `None` falls back to `UUBED_NUM_THREADS`, then to the global rayon pool.
+/// `Some(0)` means the default number of threads.
+fn with_threads<R, F>(num_threads: Option<usize>, op: F) -> R
+where
+    R: Send,
+    F: FnOnce() -> R + Send,
+{
+    match num_threads.or(*ENV_NUM_THREADS) {
+        Some(0) | None => op(),
+        Some(threads) if threads == rayon::current_num_threads() => op(),
+        Some(threads) => thread_pool(threads).install(op),
+    }
+}
+
 /// Parallel Q64 encoding for multiple embeddings
 ///
 /// # Arguments
 /// * `embeddings` - Vector of embedding byte slices
-/// * `num_threads` - Optional number of threads (defaults to system cores)
+/// * `num_threads` - Optional number of threads (defaults to `UUBED_NUM_THREADS`,
+///   then system cores)
 ///
 /// # Returns
 /// * `Vec<String>` - Encoded strings in same order as input
@@ -18,22 +79,88 @@ use crate::error::UubedError;
 /// - Scales linearly up to available CPU cores
 /// - Optimal for embeddings >1KB and batch sizes >100
 pub fn parallel_q64_encode(embeddings: &[&[u8]], num_threads: Option<usize>) -> Vec<String> {
-    // Set thread pool size if specified
-    if let Some(threads) = num_threads {
-        rayon::ThreadPoolBuilder::new()
-            .num_threads(threads)
-            .build()
-            .unwrap()
-            .install(|| {
-                embeddings.par_iter()
-                    .map(|embedding| q64_encode(embedding))
-                    .collect()
-            })
-    } else {
+    let total_len: usize = embeddings.iter().map(|embedding| embedding.len()).sum();
+    let min_rows = rows_per_task(total_len / embeddings.len().max(1));
+
+    // Use the cached pool for the requested thread count
+    with_threads(num_threads, || {
         embeddings.par_iter()
+            .with_min_len(min_rows)
             .map(|embedding| q64_encode(embedding))
             .collect()
+    })
+}
+
+/// Parallel Q64 encoding of embeddings into caller-provided outputs
+///
+/// # Arguments
+/// * `embeddings` - Vector of embedding byte slices
+/// * `outputs` - One buffer per embedding, each at least twice its length
+/// * `num_threads` - Optional number of threads
+///
+/// # Performance
+/// - No intermediate `String`s: each row is written straight into its output
+/// - Rows are grouped into tasks of at least `MIN_TASK_BYTES`
+pub fn parallel_q64_encode_into(
+    embeddings: &[&[u8]],
+    outputs: &mut [&mut [u8]],
+    num_threads: Option<usize>,
+) {
+    let total_len: usize = embeddings.iter().map(|embedding| embedding.len()).sum();
+    let min_rows = rows_per_task(total_len / embeddings.len().max(1));
+
+    with_threads(num_threads, || {
+        embeddings.par_iter()
+            .zip(outputs.par_iter_mut())
+            .with_min_len(min_rows)
+            .for_each(|(embedding, output)| q64_encode_into(embedding, output))
+    })
+}
+
+/// Parallel Q64 encoding of a contiguous row-major matrix of embeddings
+///
+/// # Arguments
+/// * `data` - Flat `rows * row_len` embedding matrix
+/// * `row_len` - Length of each embedding (matrix width)
+/// * `output` - Pre-allocated buffer of exactly `data.len() * 2` bytes
+/// * `num_threads` - Optional number of threads
+///
+/// Row `i` is encoded into `output[i * 2 * row_len..(i + 1) * 2 * row_len]`.
+///
+/// # Performance
+/// - Single flat output allocation instead of one per embedding
+/// - No per-row slice gathering before dispatch
+/// - Rows are distributed in contiguous blocks of at least `MIN_TASK_BYTES`;
+///   with an even `row_len` a whole block is encoded in one kernel call
+pub fn parallel_q64_encode_matrix(
+    data: &[u8],
+    row_len: usize,
+    output: &mut [u8],
+    num_threads: Option<usize>
+) {
+    debug_assert_eq!(output.len(), data.len() * 2);
+    if row_len == 0 {
+        return;
     }
+
+    let block_len = row_len * rows_per_task(row_len);
+    let encode_rows = |output: &mut [u8]| {
+        data.par_chunks(block_len)
+            .zip(output.par_chunks_mut(block_len * 2))
+            .for_each(|(block, out)| {
+                if row_len % 2 == 0 {
+                    // Alphabets depend only on byte-index parity, so consecutive
+                    // even-length rows encode identically as one run
+                    q64_encode_into(block, out);
+                } else {
+                    for (row, row_out) in block.chunks(row_len).zip(out.chunks_mut(row_len * 2)) {
+                        q64_encode_into(row, row_out);
+                    }
+                }
+            });
+    };
+
+    with_threads(num_threads, || encode_rows(output))
 }
 
 /// Parallel SimHash encoding for multiple embeddings
@@ -50,21 +177,11 @@ pub fn parallel_simhash_encode(
     planes: usize, 
     num_threads: Option<usize>
 ) -> Vec<String> {
-    if let Some(threads) = num_threads {
-        rayon::ThreadPoolBuilder::new()
-            .num_threads(threads)
-            .build()
-            .unwrap()
-            .install(|| {
-                embeddings.par_iter()
-                    .map(|embedding| simhash_q64(embedding, planes))
-                    .collect()
-            })
-    } else {
+    with_threads(num_threads, || {
         embeddings.par_iter()
             .map(|embedding| simhash_q64(embedding, planes))
             .collect()
-    }
+    })
 }
 
 /// Parallel Top-K encoding for multiple embeddings
@@ -81,21 +198,42 @@ pub fn parallel_topk_encode(
     k: usize, 
     num_threads: Option<usize>
 ) -> Vec<String> {
-    if let Some(threads) = num_threads {
-        rayon::ThreadPoolBuilder::new()
-            .num_threads(threads)
-            .build()
-            .unwrap()
-            .install(|| {
-                embeddings.par_iter()
-                    .map(|embedding| top_k_q64_optimized(embedding, k))
-                    .collect()
-            })
-    } else {
+    with_threads(num_threads, || {
         embeddings.par_iter()
             .map(|embedding| top_k_q64_optimized(embedding, k))
             .collect()
-    }
+    })
+}
+
+/// Fused parallel Q64, SimHash and Top-K encoding for multiple embeddings
+///
+/// # Arguments
+/// * `embeddings` - Vector of embedding byte slices
+/// * `planes` - Number of hyperplanes for SimHash
+/// * `k` - Number of top indices to select
+/// * `num_threads` - Optional number of threads
+///
+/// # Returns
+/// * `Vec<(String, String, String)>` - `(q64, simhash, topk)` per embedding
+///
+/// # Performance
+/// - One dispatch instead of three separate batch passes
+/// - Each embedding is read once into cache and reused by all three encoders
+pub fn parallel_encode_all(
+    embeddings: &[&[u8]],
+    planes: usize,
+    k: usize,
+    num_threads: Option<usize>
+) -> Vec<(String, String, String)> {
+    with_threads(num_threads, || {
+        embeddings.par_iter()
+            .map(|embedding| (
+                q64_encode(embedding),
+                simhash_q64(embedding, planes),
+                top_k_q64_optimized(embedding, k),
+            ))
+            .collect()
+    })
 }
 
 /// Parallel Z-order encoding for multiple embeddings
@@ -107,21 +245,11 @@ pub fn parallel_topk_encode(
 /// # Returns
 /// * `Vec<String>` - Encoded Z-order strings
 pub fn parallel_zorder_encode(embeddings: &[&[u8]], num_threads: Option<usize>) -> Vec<String> {
-    if let Some(threads) = num_threads {
-        rayon::ThreadPoolBuilder::new()
-            .num_threads(threads)
-            .build()
-            .unwrap()
-            .install(|| {
-                embeddings.par_iter()
-                    .map(|embedding| z_order_q64(embedding))
-                    .collect()
-            })
-    } else {
+    with_threads(num_threads, || {
         embeddings.par_iter()
             .map(|embedding| z_order_q64(embedding))
             .collect()
-    }
+    })
 }
 
 /// High-performance batch processor with work-stealing and adaptive load balancing
@@ -173,14 +301,13 @@ impl BatchProcessor {
     where
         F: Fn(&[u8]) -> String + Send + Sync,
     {
+        // An indexed iterator collects straight into a pre-sized result, with
+        // no per-chunk intermediate vectors; no task spans more than one chunk
         self.thread_pool.install(|| {
             embeddings
-                .par_chunks(self.chunk_size)
-                .flat_map(|chunk| {
-                    chunk.par_iter()
-                        .map(|embedding| method(embedding))
-                        .collect::<Vec<_>>()
-                })
+                .par_iter()
+                .with_max_len(self.chunk_size)
+                .map(|embedding| method(embedding))
                 .collect()
         })
     }
@@ -225,6 +352,66 @@ mod tests {
         }
     }
     
+    #[test]
+    fn test_parallel_q64_encode_matrix() {
+        // Small batches, plus odd and even widths spanning several task blocks
+        for &(rows, row_len) in &[(5usize, 7usize), (5000, 7), (100, 384)] {
+            let data: Vec<u8> = (0..(rows * row_len) as u32).map(|i| (i * 37 % 256) as u8).collect();
+            let mut output = vec![0u8; data.len() * 2];
+
+            parallel_q64_encode_matrix(&data, row_len, &mut output, Some(2));
+
+            // Each output row must match encoding that row on its own
+            for (row, out) in data.chunks(row_len).zip(output.chunks(row_len * 2)) {
+                assert_eq!(q64_encode(row).as_bytes(), out);
+            }
+        }
+    }
+    
+    #[test]
+    fn test_parallel_q64_encode_into() {
+        // Mixed lengths, enough rows to span several tasks
+        let embeddings: Vec<Vec<u8>> = (0..3000usize)
+            .map(|i| (0..i % 37).map(|j| (i * 31 + j) as u8).collect())
+            .collect();
+        let embedding_refs: Vec<&[u8]> = embeddings.iter().map(|e| e.as_slice()).collect();
+        let mut buffers: Vec<Vec<u8>> = embeddings.iter().map(|e| vec![0u8; e.len() * 2]).collect();
+        let mut outputs: Vec<&mut [u8]> = buffers.iter_mut().map(|b| b.as_mut_slice()).collect();
+
+        parallel_q64_encode_into(&embedding_refs, &mut outputs, Some(2));
+
+        for (embedding, buffer) in embeddings.iter().zip(&buffers) {
+            assert_eq!(q64_encode(embedding).as_bytes(), &buffer[..]);
+        }
+    }
+    
+    #[test]
+    fn test_thread_pool_reused() {
+        let first = thread_pool(3);
+        let second = thread_pool(3);
+        assert!(Arc::ptr_eq(&first, &second));
+        assert_eq!(first.current_num_threads(), 3);
+    }
+    
+    #[test]
+    fn test_parallel_encode_all_matches_separate_passes() {
+        let embeddings: Vec<Vec<u8>> = (0..6u8)
+            .map(|seed| (0..64u8).map(|i| i.wrapping_mul(seed).wrapping_add(seed)).collect())
+            .collect();
+        let embedding_refs: Vec<&[u8]> = embeddings.iter().map(|e| e.as_slice()).collect();
+        
+        let fused = parallel_encode_all(&embedding_refs, 64, 8, Some(2));
+        let q64 = parallel_q64_encode(&embedding_refs, Some(2));
+        let simhash = parallel_simhash_encode(&embedding_refs, 64, Some(2));
+        let topk = parallel_topk_encode(&embedding_refs, 8, Some(2));
+        
+        for (i, (q, s, t)) in fused.into_iter().enumerate() {
+            assert_eq!(q, q64[i]);
+            assert_eq!(s, simhash[i]);
+            assert_eq!(t, topk[i]);
+        }
+    }
+    
     #[test]
     fn test_batch_processor() {
         let processor = BatchProcessor::new(Some(2), Some(2)).unwrap();
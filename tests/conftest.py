@@ -0,0 +1,12 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture(scope="module")
+def shared_executor():
+    # One warm worker pool per test module instead of a pool per test
+    executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+    yield executor
+    executor.shutdown(wait=True)
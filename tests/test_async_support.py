@@ -1,24 +1,34 @@
 import pytest
 import asyncio
-import numpy as np
-from concurrent.futures import ThreadPoolExecutor
+import logging
+from logging.handlers import MemoryHandler
 
 try:
     import uubed_rs
 except ImportError:
     pytest.skip("uubed_rs module not installed", allow_module_level=True)
 
+# Imported only once the native module is known to be present
+np = pytest.importorskip("numpy")
+
+# Progress messages are buffered and written out in one go per stream
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+progress_handler = MemoryHandler(capacity=100, target=logging.StreamHandler())
+log.addHandler(progress_handler)
+
+SEED = np.random.SeedSequence(0xC0FFEE)
+RNG = np.random.default_rng(SEED)
+
 
 class TestAsyncSupport:
     @pytest.mark.asyncio
-    async def test_async_batch_processing(self):
+    async def test_async_batch_processing(self, shared_executor):
         # Test async batch processing with thread pool
-        executor = ThreadPoolExecutor(max_workers=4)
-        
         async def encode_batch_async(embeddings):
             loop = asyncio.get_event_loop()
             return await loop.run_in_executor(
-                executor, 
+                shared_executor,
                 uubed_rs.parallel_q64_encode_native,
                 embeddings,
                 4
@@ -27,29 +37,25 @@ class TestAsyncSupport:
         # Create test data
         batch_size = 1000
         embedding_size = 256
-        embeddings = [
-            np.random.randint(0, 256, size=embedding_size, dtype=np.uint8) 
-            for _ in range(batch_size)
-        ]
+        embeddings = RNG.integers(
+            0, 256, size=(batch_size, embedding_size), dtype=np.uint8
+        )
         
         # Process asynchronously
         results = await encode_batch_async(embeddings)
         assert len(results) == batch_size
         
-        executor.shutdown()
-        
     @pytest.mark.asyncio
-    async def test_concurrent_encoding(self):
+    async def test_concurrent_encoding(self, shared_executor):
         # Test concurrent encoding of multiple batches
         async def encode_batch(batch_id, size):
-            embeddings = [
-                np.random.randint(0, 256, size=128, dtype=np.uint8) 
-                for _ in range(size)
-            ]
+            # Independent child stream per task so concurrent tasks never share RNG state
+            rng = np.random.default_rng(SEED.spawn(1)[0])
+            embeddings = rng.integers(0, 256, size=(size, 128), dtype=np.uint8)
             
             loop = asyncio.get_event_loop()
             results = await loop.run_in_executor(
-                None,
+                shared_executor,
                 uubed_rs.q64_encode_batch_native,
                 embeddings,
                 True
@@ -68,7 +74,7 @@ class TestAsyncSupport:
         assert all(count == 100 for _, count in results)
         
     @pytest.mark.asyncio
-    async def test_streaming_async(self):
+    async def test_streaming_async(self, shared_executor):
         # Test async streaming with progress updates
         class AsyncStreamProcessor:
             def __init__(self):
@@ -76,52 +82,50 @@ class TestAsyncSupport:
                 self.processed = 0
                 
             async def process_stream(self, chunks):
-                results = []
+                # Encode every chunk straight into its row of one output array
+                results = np.empty((len(chunks), chunks.shape[1] * 2), dtype=np.uint8)
                 for i, chunk in enumerate(chunks):
-                    # Simulate async I/O or computation
-                    await asyncio.sleep(0.001)
+                    # Yield to the event loop without arming a timer
+                    await asyncio.sleep(0)
                     
                     # Encode chunk
                     loop = asyncio.get_event_loop()
-                    encoded = await loop.run_in_executor(
-                        None,
-                        self.encoder.encode_chunk,
-                        chunk
+                    written = await loop.run_in_executor(
+                        shared_executor,
+                        self.encoder.encode_chunk_into,
+                        chunk,
+                        results[i]
                     )
-                    results.append(encoded)
+                    assert written == results.shape[1]
                     self.processed += 1
                     
                     # Could yield progress here
                     if i % 10 == 0:
-                        print(f"Processed {i+1}/{len(chunks)} chunks")
-                        
+                        log.info("Processed %d/%d chunks", i + 1, len(chunks))
+                
+                progress_handler.flush()
                 return results
         
-        # Create test chunks
-        chunks = [
-            np.random.randint(0, 256, size=1024, dtype=np.uint8)
-            for _ in range(50)
-        ]
+        # Create test chunks (each row is a zero-copy view)
+        chunks = RNG.integers(0, 256, size=(50, 1024), dtype=np.uint8)
         
         processor = AsyncStreamProcessor()
         results = await processor.process_stream(chunks)
         
         assert len(results) == 50
         assert processor.processed == 50
+        assert bytes(results[0]) == uubed_rs.q64_encode_buffer_native(chunks[0])
         
     @pytest.mark.asyncio
-    async def test_async_with_timeout(self):
+    async def test_async_with_timeout(self, shared_executor):
         # Test async operations with timeout
         async def slow_encoding():
             # Simulate a large batch that takes time
-            embeddings = [
-                np.random.randint(0, 256, size=1024, dtype=np.uint8) 
-                for _ in range(5000)
-            ]
+            embeddings = RNG.integers(0, 256, size=(5000, 1024), dtype=np.uint8)
             
             loop = asyncio.get_event_loop()
             return await loop.run_in_executor(
-                None,
+                shared_executor,
                 uubed_rs.parallel_q64_encode_native,
                 embeddings,
                 1  # Use single thread to make it slower
@@ -135,56 +139,29 @@ class TestAsyncSupport:
             pytest.fail("Encoding timed out")
             
     @pytest.mark.asyncio
-    async def test_async_pipeline(self):
+    async def test_async_pipeline(self, shared_executor):
         # Test async pipeline with multiple stages
         async def pipeline():
             # Stage 1: Generate embeddings
             embeddings = await generate_embeddings_async(100)
             
-            # Stage 2: Encode with Q64
-            q64_encoded = await encode_async(embeddings, 'q64')
-            
-            # Stage 3: Generate SimHash
-            simhash_encoded = await encode_async(embeddings, 'simhash')
-            
-            # Stage 4: Generate Top-K
-            topk_encoded = await encode_async(embeddings, 'topk')
-            
-            return q64_encoded, simhash_encoded, topk_encoded
+            # Stage 2: Q64, SimHash and Top-K in one fused pass
+            return await encode_all_async(embeddings)
         
         async def generate_embeddings_async(count):
             await asyncio.sleep(0.01)  # Simulate async generation
-            return [
-                np.random.randint(0, 256, size=256, dtype=np.uint8)
-                for _ in range(count)
-            ]
+            return RNG.integers(0, 256, size=(count, 256), dtype=np.uint8)
         
-        async def encode_async(embeddings, method):
+        async def encode_all_async(embeddings):
             loop = asyncio.get_event_loop()
-            
-            if method == 'q64':
-                return await loop.run_in_executor(
-                    None,
-                    uubed_rs.parallel_q64_encode_native,
-                    embeddings,
-                    4
-                )
-            elif method == 'simhash':
-                return await loop.run_in_executor(
-                    None,
-                    uubed_rs.parallel_simhash_encode_native,
-                    embeddings,
-                    64,
-                    4
-                )
-            elif method == 'topk':
-                return await loop.run_in_executor(
-                    None,
-                    uubed_rs.parallel_topk_encode_native,
-                    embeddings,
-                    8,
-                    4
-                )
+            return await loop.run_in_executor(
+                shared_executor,
+                uubed_rs.encode_all_native,
+                embeddings,
+                64,
+                8,
+                4
+            )
         
         q64, simhash, topk = await pipeline()
         assert len(q64) == 100
@@ -194,58 +171,43 @@ class TestAsyncSupport:
 
 class TestAsyncProgressCallbacks:
     @pytest.mark.asyncio
-    async def test_progress_callback_simulation(self):
+    async def test_progress_callback_simulation(self, shared_executor):
         # Simulate progress callbacks for long-running operations
         class ProgressTracker:
             def __init__(self):
-                self.progress_queue = asyncio.Queue()
+                self._progress = 0.0
                 self.total_items = 0
                 self.processed_items = 0
                 
+            def on_progress(self, done, total):
+                # Called from the encoding thread; the monitor samples it at its own rate
+                self.processed_items = done
+                self._progress = done / total
+                
             async def process_with_progress(self, embeddings, chunk_size=100):
                 self.total_items = len(embeddings)
-                results = []
                 
-                for i in range(0, len(embeddings), chunk_size):
-                    chunk = embeddings[i:i+chunk_size]
-                    
-                    # Process chunk
-                    loop = asyncio.get_event_loop()
-                    chunk_results = await loop.run_in_executor(
-                        None,
-                        uubed_rs.q64_encode_batch_native,
-                        chunk,
-                        True
-                    )
-                    results.extend(chunk_results)
-                    
-                    # Update progress
-                    self.processed_items += len(chunk)
-                    progress = self.processed_items / self.total_items
-                    await self.progress_queue.put(progress)
-                    
-                return results
+                # Chunking and progress reporting happen on the Rust side
+                loop = asyncio.get_event_loop()
+                return await loop.run_in_executor(
+                    shared_executor,
+                    uubed_rs.q64_encode_batch_chunked,
+                    embeddings,
+                    chunk_size,
+                    self.on_progress
+                )
             
             async def monitor_progress(self):
                 progress_values = []
                 while True:
-                    try:
-                        progress = await asyncio.wait_for(
-                            self.progress_queue.get(), 
-                            timeout=0.1
-                        )
-                        progress_values.append(progress)
-                        if progress >= 1.0:
-                            break
-                    except asyncio.TimeoutError:
+                    await asyncio.sleep(0.02)
+                    progress_values.append(self._progress)
+                    if self._progress >= 1.0:
                         break
                 return progress_values
         
         # Create test data
-        embeddings = [
-            np.random.randint(0, 256, size=128, dtype=np.uint8)
-            for _ in range(1000)
-        ]
+        embeddings = RNG.integers(0, 256, size=(1000, 128), dtype=np.uint8)
         
         tracker = ProgressTracker()
         
@@ -1,29 +1,44 @@
 import pytest
-import numpy as np
 
 try:
     import uubed_rs
 except ImportError:
     pytest.skip("uubed_rs module not installed", allow_module_level=True)
 
+# Imported only once the native module is known to be present
+np = pytest.importorskip("numpy")
+
+RNG = np.random.default_rng(0xC0FFEE)
+
 
 class TestNumpyIntegration:
     def test_q64_encode_numpy_array(self):
         # Test encoding of numpy arrays
-        data = np.random.randint(0, 256, size=1024, dtype=np.uint8)
+        data = RNG.integers(0, 256, size=1024, dtype=np.uint8)
         
         # Should work directly with numpy arrays
         encoded = uubed_rs.q64_encode_buffer_native(data)
         assert isinstance(encoded, bytes)
         assert len(encoded) == len(data) * 2
         
+        # The str-returning encoder takes arrays and int lists in one call
+        expected = uubed_rs.q64_encode_native(data.tobytes())
+        assert uubed_rs.q64_encode_native(data) == expected
+        assert uubed_rs.q64_encode_native(data.tolist()) == expected
+        with pytest.raises(TypeError):
+            uubed_rs.q64_encode_native(None)
+        
+        # Strided views fall back to a contiguous copy
+        strided = uubed_rs.q64_encode_buffer_native(data[::2])
+        assert strided == uubed_rs.q64_encode_buffer_native(data[::2].copy())
+        
     def test_q64_batch_encode_numpy(self):
         # Test batch encoding with numpy arrays
         batch_size = 100
         embedding_size = 384
         
         embeddings = [
-            np.random.randint(0, 256, size=embedding_size, dtype=np.uint8) 
+            RNG.integers(0, 256, size=embedding_size, dtype=np.uint8) 
             for _ in range(batch_size)
         ]
         
@@ -33,9 +48,26 @@ class TestNumpyIntegration:
         assert all(isinstance(r, bytes) for r in results)
         assert all(len(r) == embedding_size * 2 for r in results)
         
+        # Mutable outputs for in-place post-processing
+        arrays = uubed_rs.q64_encode_batch_native(embeddings, output_type="bytearray")
+        assert all(isinstance(r, bytearray) for r in arrays)
+        assert [bytes(r) for r in arrays] == results
+        
+        with pytest.raises(ValueError):
+            uubed_rs.q64_encode_batch_native(embeddings, output_type="str")
+        
+    def test_q64_matrix_encode_numpy(self):
+        # Test encoding a whole 2-D batch in one call
+        embeddings = RNG.integers(0, 256, size=(100, 384), dtype=np.uint8)
+        
+        results = uubed_rs.q64_encode_matrix_native(embeddings, num_threads=4)
+        assert len(results) == 100
+        assert all(isinstance(r, bytes) for r in results)
+        assert results[7] == uubed_rs.q64_encode_buffer_native(embeddings[7])
+        
     def test_q64_inplace_numpy(self):
         # Test in-place encoding with pre-allocated numpy buffer
-        input_data = np.random.randint(0, 256, size=512, dtype=np.uint8)
+        input_data = RNG.integers(0, 256, size=512, dtype=np.uint8)
         output_buffer = np.zeros(1024, dtype=np.uint8)  # 2x size for Q64
         
         bytes_written = uubed_rs.q64_encode_inplace_native(input_data, output_buffer)
@@ -44,9 +76,17 @@ class TestNumpyIntegration:
         # Verify output buffer was modified
         assert not np.all(output_buffer == 0)
         
+        # Strided inputs are accepted like everywhere else; read-only outputs
+        # are rejected with the shared error
+        strided_output = np.zeros(512, dtype=np.uint8)
+        assert uubed_rs.q64_encode_inplace_native(input_data[::2], strided_output) == 512
+        assert bytes(strided_output) == uubed_rs.q64_encode_buffer_native(input_data[::2])
+        with pytest.raises(ValueError, match="output buffer"):
+            uubed_rs.q64_encode_inplace_native(input_data, bytes(1024))
+        
     def test_simhash_numpy_buffer(self):
         # Test SimHash with numpy arrays
-        embedding = np.random.randint(0, 256, size=1536, dtype=np.uint8)
+        embedding = RNG.integers(0, 256, size=1536, dtype=np.uint8)
         planes = 64
         output_size = planes // 4  # 64 bits = 16 Q64 chars
         output_buffer = np.zeros(output_size, dtype=np.uint8)
@@ -56,7 +96,7 @@ class TestNumpyIntegration:
         
     def test_topk_numpy_buffer(self):
         # Test Top-K with numpy arrays
-        embedding = np.random.randint(0, 256, size=768, dtype=np.uint8)
+        embedding = RNG.integers(0, 256, size=768, dtype=np.uint8)
         k = 10
         output_size = k * 2  # Each index encoded as 2 Q64 chars
         output_buffer = np.zeros(output_size, dtype=np.uint8)
@@ -70,7 +110,7 @@ class TestNumpyIntegration:
         embedding_size = 256
         
         embeddings = [
-            np.random.randint(0, 256, size=embedding_size, dtype=np.uint8) 
+            RNG.integers(0, 256, size=embedding_size, dtype=np.uint8) 
             for _ in range(batch_size)
         ]
         
@@ -79,6 +119,10 @@ class TestNumpyIntegration:
         assert len(results) == batch_size
         assert all(isinstance(r, str) for r in results)
         
+        # A contiguous 2-D array takes the single-buffer path with identical results
+        matrix = np.stack(embeddings)
+        assert uubed_rs.parallel_q64_encode_native(matrix, num_threads=4) == results
+        
         # Test parallel SimHash encoding
         simhash_results = uubed_rs.parallel_simhash_encode_native(embeddings, 64, num_threads=4)
         assert len(simhash_results) == batch_size
@@ -94,7 +138,7 @@ class TestNumpyIntegration:
         # Process multiple chunks
         chunk_results = []
         for _ in range(10):
-            chunk = np.random.randint(0, 256, size=8192, dtype=np.uint8)
+            chunk = RNG.integers(0, 256, size=8192, dtype=np.uint8)
             encoded = encoder.encode_chunk(chunk)
             chunk_results.append(encoded)
             
@@ -110,7 +154,7 @@ class TestNumpyIntegration:
         batch_processor = uubed_rs.SimpleBatchProcessor(chunk_size=100)
         
         embeddings = [
-            np.random.randint(0, 256, size=128, dtype=np.uint8) 
+            RNG.integers(0, 256, size=128, dtype=np.uint8) 
             for _ in range(500)
         ]
         
@@ -121,6 +165,19 @@ class TestNumpyIntegration:
         stats = pool.get_stats()
         assert 'allocations' in stats
         assert 'reuses' in stats
+        
+        # A returned buffer serves any later request in its size class
+        pool.return_buffer(pool.get_buffer(128))
+        assert len(pool.get_buffer(100)) == 100
+        assert pool.get_stats()['reuses'] == 1
+        
+        # Buffers of common embedding widths come back from Python with an
+        # exact capacity and must still be reused
+        for size in (384, 768):
+            pool = uubed_rs.BufferPool(max_pool_size=50)
+            pool.return_buffer(pool.get_buffer(size))
+            assert len(pool.get_buffer(size)) == size
+            assert pool.get_stats()['reuses'] == 1
 
 
 class TestMemoryEfficiency:
@@ -129,28 +186,44 @@ class TestMemoryEfficiency:
         batch_size = 10000
         embedding_size = 384
         
-        # Create a view into a large numpy array to minimize copies
-        large_array = np.random.randint(0, 256, size=(batch_size, embedding_size), dtype=np.uint8)
+        # One contiguous numpy array holds the whole batch
+        large_array = RNG.integers(0, 256, size=(batch_size, embedding_size), dtype=np.uint8)
         
-        # Process using views
-        embeddings = [large_array[i] for i in range(batch_size)]
-        
-        # Use batch processor for memory-efficient processing
+        # Use batch processor for memory-efficient processing; the 2-D array
+        # is passed as a single buffer rather than one view per row
         processor = uubed_rs.SimpleBatchProcessor(chunk_size=1000)
-        results = processor.process_batch(embeddings)
+        with pytest.raises(ValueError):
+            uubed_rs.SimpleBatchProcessor(chunk_size=0)
+        results = processor.process_batch(large_array)
         
         assert len(results) == batch_size
+        assert results == uubed_rs.q64_encode_batch_native(large_array)
+        assert results[0] == uubed_rs.q64_encode_buffer_native(large_array[0])
+        
+        # Stream the same results one chunk at a time
+        assert list(processor.process_batch_iter(large_array)) == results
+        assert list(processor.process_batch_iter(list(large_array[:5]))) == results[:5]
+        
+        # Encode into one preallocated output array instead of bytes objects
+        output = np.empty((batch_size, embedding_size * 2), dtype=np.uint8)
+        assert processor.process_batch_into(large_array, output) == output.size
+        assert bytes(output[0]) == results[0]
+        assert bytes(output[-1]) == results[-1]
         
     def test_zero_copy_roundtrip(self):
         # Test zero-copy operations
-        original = np.random.randint(0, 256, size=1024, dtype=np.uint8)
+        original = RNG.integers(0, 256, size=1024, dtype=np.uint8)
         
         # Encode using buffer API
         encoded = uubed_rs.q64_encode_buffer_native(original)
         
-        # Decode back
-        decoded = uubed_rs.q64_decode_native(encoded.decode('ascii'))
-        decoded_array = np.array(decoded, dtype=np.uint8)
+        # Decode back straight into bytes, viewed as an array without copying
+        decoded_array = np.frombuffer(uubed_rs.q64_decode_buffer_native(encoded), dtype=np.uint8)
         
         # Verify roundtrip
-        np.testing.assert_array_equal(original, decoded_array)
\ No newline at end of file
+        np.testing.assert_array_equal(original, decoded_array)
+        
+        # Decode into a preallocated array
+        output = np.empty_like(original)
+        assert uubed_rs.q64_decode_inplace_native(encoded, output) == len(original)
+        np.testing.assert_array_equal(original, output)
\ No newline at end of file